@@ -1,5 +1,15 @@
 from celery import Celery
+from kombu import Queue
+from celery.signals import worker_init, worker_process_shutdown, worker_shutdown
 from app.core.config import settings
+from app.core.event_loop import get_worker_loop
+from app.core.metrics import QueueDepthCollector, start_worker_exporter
+from app.core import tracing  # noqa: F401 (태스크 헤더로 추적 정보를 전달하는 신호 등록)
+from app.core.routing import chat_shard_queues, route_llm_task
+from app.core.serialization import SERIALIZER_NAME, register_kombu_serializer
+
+# msgpack + 압축 직렬화 등록 (설정 적용 전에 등록해야 함)
+register_kombu_serializer()
 
 # 1. Celery 인스턴스 생성
 celery_app = Celery(
@@ -8,14 +18,58 @@ celery_app = Celery(
     backend=settings.CELERY_RESULT_BACKEND
 )
 
+# 큐 선언 (큐마다 우선순위 지원)
+_queue_arguments = {"x-max-priority": settings.CELERY_QUEUE_MAX_PRIORITY}
+_queue_names = [
+    settings.CELERY_CHAT_QUEUE,
+    settings.CELERY_FEEDBACK_QUEUE,
+    settings.CELERY_RESULT_QUEUE,
+    *chat_shard_queues(),
+]
+
 # 2. 설정 적용
 celery_app.conf.update(
-    task_serializer="json",
-    result_serializer="json",
-    accept_content=["json"],
+    task_serializer=settings.CELERY_SERIALIZER,
+    result_serializer=settings.CELERY_SERIALIZER,
+    # 전환 중 남아 있는 JSON 메시지도 처리
+    accept_content=["json", SERIALIZER_NAME],
+    result_accept_content=["json", SERIALIZER_NAME],
     timezone="Asia/Seoul",
     enable_utc=True,
+    # 채팅/피드백/결과 태스크를 각자의 큐로 라우팅 (채팅은 샤드 큐 지원)
+    task_queues=[Queue(name, queue_arguments=_queue_arguments) for name in _queue_names],
+    task_default_queue=settings.CELERY_CHAT_QUEUE,
+    task_routes=(route_llm_task,),
+    task_queue_max_priority=settings.CELERY_QUEUE_MAX_PRIORITY,
+    # 결과는 보관 기간이 지나면 만료 (결과 백엔드가 무한히 커지지 않도록)
+    result_expires=settings.CELERY_RESULT_EXPIRES_SECONDS,
+    # 작업 시작 시 STARTED 상태를 기록 (상태 스트림/long-poll이 시작 시점도 받도록)
+    task_track_started=True,
+    # 긴 작업을 미리 쌓아두지 않도록 워커가 가져가는 메시지 수 제한
+    worker_prefetch_multiplier=settings.CELERY_PREFETCH_MULTIPLIER,
 )
 
+# asyncio 모드: 풀 스레드는 코루틴 완료만 기다리고 실제 I/O는 프로세스당 이벤트 루프에서 처리
+if settings.LLM_TASK_MODE == "asyncio":
+    celery_app.conf.update(
+        worker_pool="threads",
+        worker_concurrency=settings.LLM_ASYNC_MAX_INFLIGHT,
+    )
+
+
+@worker_init.connect
+def _start_metrics_exporter(**kwargs):
+    """워커 지표 HTTP 서버 시작 (큐 대기 메시지 수 포함)"""
+    if settings.WORKER_METRICS_PORT > 0:
+        start_worker_exporter(settings.WORKER_METRICS_PORT, QueueDepthCollector(celery_app, _queue_names))
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _stop_worker_loop(**kwargs):
+    """워커 종료 시 이벤트 루프 정리"""
+    get_worker_loop().stop()
+
+
 # 3. Task 명시적 import (autodiscover 대신)
 from app.domain.LLM import task  # noqa
\ No newline at end of file
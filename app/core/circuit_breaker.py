@@ -0,0 +1,151 @@
+"""
+Redis 공유 서킷 브레이커
+
+상태는 세션 Redis의 해시(circuit:{name})에 두므로 모든 워커가 같은 상태를 봅니다.
+- 닫힘: 실패 횟수만 셈 (첫 실패부터 failure_window 동안, 성공은 기록하지 않음)
+- 열림: 실패가 기준에 도달하면 open_seconds 동안 호출 차단
+- 반열림: 열림 시간이 지나면 탐색 호출 하나만 허용, 성공하면 닫히고 실패하면 다시 열림
+  (열리기 전에 시작한 느린 호출이 성공해도 서킷을 닫지 않음)
+"""
+import logging
+
+from app.core.redis import REDIS_SESSION, get_redis_pool
+
+logger = logging.getLogger(__name__)
+
+# 호출 허용 여부 (0: 허용, -1: 반열림 탐색 호출로 허용, 양수: 다시 시도할 수 있을 때까지 남은 밀리초)
+_ACQUIRE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local opened_until = tonumber(redis.call('HGET', KEYS[1], 'opened_until') or '0')
+if opened_until == 0 then
+    return 0
+end
+if now < opened_until then
+    return opened_until - now
+end
+local probe_timeout = tonumber(ARGV[1])
+local probe = tonumber(redis.call('HGET', KEYS[1], 'probe') or '0')
+if now - probe < probe_timeout then
+    return probe_timeout - (now - probe)
+end
+redis.call('HSET', KEYS[1], 'probe', now)
+return -1
+"""
+
+# 탐색 호출 성공 (반열림 상태일 때만 닫음, 그 사이 다시 열렸으면 유지)
+_PROBE_SUCCESS_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local opened_until = tonumber(redis.call('HGET', KEYS[1], 'opened_until') or '0')
+if opened_until == 0 or now < opened_until then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+return 1
+"""
+
+# 실패 기록 (기준 도달 또는 반열림 탐색 실패 시 열림, 열렸으면 1 반환)
+_FAILURE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local threshold = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local open_for = tonumber(ARGV[3])
+local opened_until = tonumber(redis.call('HGET', KEYS[1], 'opened_until') or '0')
+local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+if (opened_until > 0 and now >= opened_until) or (opened_until == 0 and failures >= threshold) then
+    redis.call('HSET', KEYS[1], 'opened_until', now + open_for, 'failures', 0)
+    redis.call('HDEL', KEYS[1], 'probe')
+    redis.call('PEXPIRE', KEYS[1], open_for + window)
+    return 1
+end
+if opened_until == 0 and failures == 1 then
+    redis.call('PEXPIRE', KEYS[1], window)
+end
+return 0
+"""
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 호출하지 않음"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit {name} is open (retry after {retry_after:.1f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def circuit_key(name: str) -> str:
+    return f"circuit:{name}"
+
+
+class CircuitBreaker:
+    """
+    이름 하나에 대한 서킷 브레이커
+
+    Redis 장애 시에는 브레이커 없이 호출을 허용합니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        failure_window_seconds: float,
+        open_seconds: float,
+        probe_timeout_seconds: float,
+    ):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._failure_window_ms = int(failure_window_seconds * 1000)
+        self._open_ms = int(open_seconds * 1000)
+        self._probe_timeout_ms = int(probe_timeout_seconds * 1000)
+
+    async def _run_script(self, source: str, *args):
+        """서킷 해시에 대해 Lua 스크립트 실행 (클라이언트는 호출마다 풀에 반납)"""
+        redis_client = await get_redis_pool(REDIS_SESSION)
+        try:
+            script = redis_client.register_script(source)
+            return await script(keys=[circuit_key(self.name)], args=list(args))
+        finally:
+            await redis_client.aclose()
+
+    async def before_call(self) -> bool:
+        """
+        호출 전 확인 (열려 있으면 CircuitOpenError)
+
+        Returns:
+            반열림 탐색 호출이면 True (성공 시 record_success(probe=True)로 서킷을 닫음)
+        """
+        try:
+            retry_after_ms = int(await self._run_script(_ACQUIRE_SCRIPT, self._probe_timeout_ms))
+        except Exception as e:
+            logger.warning(f"Circuit {self.name} check failed: {e}")
+            return False
+        if retry_after_ms > 0:
+            raise CircuitOpenError(self.name, retry_after_ms / 1000)
+        return retry_after_ms < 0
+
+    async def record_success(self, probe: bool) -> None:
+        """성공 기록 (탐색 호출이 성공하면 서킷을 닫음, 닫힌 상태의 성공은 기록하지 않음)"""
+        if not probe:
+            return
+        try:
+            closed = await self._run_script(_PROBE_SUCCESS_SCRIPT)
+        except Exception as e:
+            logger.warning(f"Circuit {self.name} update failed: {e}")
+            return
+        if closed:
+            logger.info(f"Circuit {self.name} closed")
+
+    async def record_failure(self) -> None:
+        """실패 기록"""
+        try:
+            opened = await self._run_script(
+                _FAILURE_SCRIPT, self._failure_threshold, self._failure_window_ms, self._open_ms
+            )
+        except Exception as e:
+            logger.warning(f"Circuit {self.name} update failed: {e}")
+            return
+        if opened:
+            logger.warning(f"Circuit {self.name} opened for {self._open_ms / 1000:.0f}s")
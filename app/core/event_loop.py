@@ -0,0 +1,94 @@
+import asyncio
+import contextvars
+import os
+import threading
+from typing import Any, Coroutine, Optional
+
+from app.core.config import settings
+
+
+class WorkerEventLoop:
+    """
+    워커 프로세스 전용 이벤트 루프
+
+    백그라운드 스레드에서 루프 하나를 돌리고, Celery 태스크는 코루틴을 제출한 뒤
+    결과만 기다립니다. 동시에 실행되는 코루틴 수는 세마포어로 제한합니다.
+    """
+
+    def __init__(self, max_inflight: int):
+        self._max_inflight = max_inflight
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    def start(self) -> None:
+        """루프 스레드 시작 (fork 이후 자식 프로세스에서 다시 생성)"""
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run() -> None:
+                asyncio.set_event_loop(loop)
+                self._semaphore = asyncio.Semaphore(self._max_inflight)
+                ready.set()
+                loop.run_forever()
+
+            thread = threading.Thread(target=run, name="worker-event-loop", daemon=True)
+            thread.start()
+            ready.wait()
+            self._loop = loop
+            self._thread = thread
+            self._pid = os.getpid()
+
+    def stop(self) -> None:
+        """루프 종료"""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+    def run(self, coro: Coroutine) -> Any:
+        """코루틴을 루프에 제출하고 완료될 때까지 호출 스레드에서 대기"""
+        context = contextvars.copy_context()
+        future = asyncio.run_coroutine_threadsafe(self._guarded(coro, context), self.loop)
+        return future.result()
+
+    async def _guarded(self, coro: Coroutine, context: contextvars.Context) -> Any:
+        # 호출 스레드의 컨텍스트 변수(현재 추적 구간 등)를 이어받음
+        for var, value in context.items():
+            var.set(value)
+        return await self.limited(coro)
+
+    async def limited(self, coro: Coroutine) -> Any:
+        """동시 실행 제한 안에서 코루틴 실행 (루프 안에서 따로 띄우는 백그라운드 작업도 같은 제한을 받도록)"""
+        async with self._semaphore:
+            return await coro
+
+
+# 프로세스 전역 루프 (첫 태스크 실행 시 생성)
+_worker_loop: WorkerEventLoop = None
+
+def get_worker_loop() -> WorkerEventLoop:
+    """워커 이벤트 루프를 반환 (싱글톤 패턴)"""
+    global _worker_loop
+    if _worker_loop is None:
+        _worker_loop = WorkerEventLoop(settings.LLM_ASYNC_MAX_INFLIGHT)
+    return _worker_loop
+
+
+def run_coroutine(coro: Coroutine) -> Any:
+    """Celery 태스크에서 코루틴을 실행"""
+    return get_worker_loop().run(coro)
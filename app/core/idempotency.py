@@ -0,0 +1,53 @@
+from typing import Optional
+
+import redis.asyncio as redis
+
+# Idempotency-Key 헤더 최대 길이
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+# 값이 같을 때만 삭제 (그 사이 다른 요청이 새로 선점한 키는 유지)
+_RELEASE_IF_VALUE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def idempotency_redis_key(scope: str, key: str) -> str:
+    return f"idempotency:{scope}:{key}"
+
+
+async def claim_idempotency_key(
+    redis_client: redis.Redis,
+    scope: str,
+    key: str,
+    value: str,
+    ttl_seconds: int,
+) -> Optional[str]:
+    """
+    멱등성 키 선점 (SET NX, 중복일 때만 기존 값 조회)
+
+    Returns:
+        처음 요청이면 None, 중복 요청이면 먼저 저장된 값
+    """
+    redis_key = idempotency_redis_key(scope, key)
+    if await redis_client.set(redis_key, value, nx=True, ex=ttl_seconds):
+        return None
+    return await redis_client.get(redis_key)
+
+
+async def release_idempotency_key(
+    redis_client: redis.Redis, scope: str, key: str, value: Optional[str] = None
+) -> None:
+    """
+    작업 등록/실행에 실패한 경우 선점한 키 해제
+
+    value를 주면 키에 저장된 값이 같을 때만 해제합니다.
+    """
+    redis_key = idempotency_redis_key(scope, key)
+    if value is None:
+        await redis_client.delete(redis_key)
+        return
+    script = redis_client.register_script(_RELEASE_IF_VALUE_SCRIPT)
+    await script(keys=[redis_key], args=[value])
@@ -0,0 +1,93 @@
+"""
+사용자별 Redis 키 이름
+
+사용자 대화 세션에 속한 키는 모두 여기서 만들고 user_session_keys에 등록합니다.
+로그아웃/세션 종료 시 이 목록만 삭제하므로 키스페이스 전체를 SCAN하지 않습니다.
+"""
+from typing import List
+
+from app.core.redis import REDIS_MEMORY, REDIS_SESSION, get_redis_pool
+
+
+def session_key(user_email: str) -> str:
+    return f"session:{user_email}"
+
+
+def room_id_key(user_email: str) -> str:
+    return f"room_id:{user_email}"
+
+
+def chat_history_key(user_email: str) -> str:
+    return f"chat_history:{user_email}"
+
+
+def memory_summary_key(user_email: str) -> str:
+    return f"memory_summary:{user_email}"
+
+
+def chat_history_version_key(user_email: str) -> str:
+    return f"chat_history_version:{user_email}"
+
+
+def memory_compacting_key(user_email: str) -> str:
+    return f"memory_compacting:{user_email}"
+
+
+def feedbacks_key(user_email: str) -> str:
+    return f"feedbacks:{user_email}"
+
+
+def feedback_turns_key(user_email: str) -> str:
+    return f"feedback_turns:{user_email}"
+
+
+def feedback_partials_key(user_email: str) -> str:
+    return f"feedback_partials:{user_email}"
+
+
+def feedback_folded_key(user_email: str) -> str:
+    return f"feedback_folded:{user_email}"
+
+
+def feedback_folding_key(user_email: str) -> str:
+    return f"feedback_folding:{user_email}"
+
+
+def talk_content_key(user_email: str) -> str:
+    return f"talk_content:{user_email}"
+
+
+def user_session_keys(user_email: str) -> List[str]:
+    """세션용 Redis에 있는 사용자 대화 세션 키 (새 사용자 키를 추가하면 여기에도 등록)"""
+    return [
+        session_key(user_email),
+        room_id_key(user_email),
+        feedbacks_key(user_email),
+        feedback_turns_key(user_email),
+        feedback_partials_key(user_email),
+        feedback_folded_key(user_email),
+        feedback_folding_key(user_email),
+        talk_content_key(user_email),
+    ]
+
+
+def user_memory_keys(user_email: str) -> List[str]:
+    """메모리용 Redis에 있는 사용자 대화 메모리 키"""
+    return [
+        chat_history_key(user_email),
+        memory_summary_key(user_email),
+        chat_history_version_key(user_email),
+        memory_compacting_key(user_email),
+    ]
+
+
+async def delete_user_session_keys(user_email: str) -> int:
+    """사용자 세션/메모리 키를 Redis 용도별로 한 번에 삭제 (UNLINK, 삭제된 키 수 반환)"""
+    deleted = 0
+    for role, keys in ((REDIS_SESSION, user_session_keys(user_email)), (REDIS_MEMORY, user_memory_keys(user_email))):
+        redis_client = await get_redis_pool(role)
+        try:
+            deleted += await redis_client.unlink(*keys)
+        finally:
+            await redis_client.aclose()
+    return deleted
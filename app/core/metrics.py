@@ -0,0 +1,220 @@
+"""
+Prometheus 지표
+
+API는 /metrics로, 워커는 worker_init 시 띄우는 HTTP 서버(WORKER_METRICS_PORT)로 노출합니다.
+prefork 워커나 uvicorn 워커를 여러 개 띄울 때는 PROMETHEUS_MULTIPROC_DIR를 지정해야
+자식 프로세스의 지표까지 합산됩니다.
+"""
+import glob
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+# LLM 호출이 포함된 구간용 버킷 (초)
+_SLOW_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route", "status"],
+)
+TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task run time",
+    ["task", "state"],
+    buckets=_SLOW_BUCKETS,
+)
+TASK_QUEUE_WAIT = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Time between publish and task start",
+    ["task", "queue"],
+    buckets=_SLOW_BUCKETS,
+)
+STAGE_DURATION = Histogram(
+    "task_stage_duration_seconds",
+    "Time spent in each stage of a task",
+    ["task", "stage"],
+    buckets=_SLOW_BUCKETS,
+)
+LLM_CALL_DURATION = Histogram(
+    "llm_call_duration_seconds",
+    "LLM provider call latency per attempt",
+    ["provider", "outcome"],
+    buckets=_SLOW_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens",
+    "LLM tokens used",
+    ["provider", "kind"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "Cache lookups by result",
+    ["cache", "result"],
+)
+DB_QUERIES = Counter(
+    "db_queries",
+    "SQL statements executed",
+    ["operation"],
+)
+REDIS_ROUND_TRIPS = Counter(
+    "redis_round_trips",
+    "Redis round trips (a pipeline counts once)",
+    ["role", "kind"],
+)
+
+
+@contextmanager
+def stage_timer(task: str, stage: str) -> Iterator[None]:
+    """태스크 안의 한 구간 소요 시간 기록 (같은 이름의 추적 구간도 함께 엶)"""
+    started = time.perf_counter()
+    try:
+        with start_span(stage, task=task):
+            yield
+    finally:
+        STAGE_DURATION.labels(task, stage).observe(time.perf_counter() - started)
+
+
+def record_stage(task: str, stage: str, seconds: float) -> None:
+    """구간 하나에 걸친 시간을 직접 기록 (재시도처럼 여러 실행에 걸친 구간용)"""
+    STAGE_DURATION.labels(task, stage).observe(seconds)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_llm_call(provider: str, outcome: str, seconds: float) -> None:
+    LLM_CALL_DURATION.labels(provider, outcome).observe(seconds)
+
+
+def record_llm_tokens(provider: str, prompt_tokens: int, completion_tokens: int) -> None:
+    LLM_TOKENS.labels(provider, "prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(provider, "completion").inc(completion_tokens)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """SQL 실행 횟수 집계 (문장 종류별)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_query(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        DB_QUERIES.labels(operation).inc()
+
+
+# Celery 태스크 지표 (발행 시각은 메시지 헤더로 전달)
+_task_started: Dict[str, float] = {}
+
+
+@before_task_publish.connect
+def _stamp_published_at(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault("published_at", time.time())
+
+
+@task_prerun.connect
+def _on_task_start(task_id=None, task=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+    published_at = getattr(task.request, "published_at", None)
+    if published_at:
+        queue = (task.request.delivery_info or {}).get("routing_key") or "unknown"
+        TASK_QUEUE_WAIT.labels(task.name, queue).observe(max(0.0, time.time() - published_at))
+
+
+@task_postrun.connect
+def _on_task_end(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+class QueueDepthCollector:
+    """수집 시점에 브로커에서 큐별 대기 메시지 수 조회"""
+
+    def __init__(self, celery_app, queue_names: Iterable[str]):
+        self._app = celery_app
+        self._queue_names = list(queue_names)
+
+    def collect(self):
+        depth = GaugeMetricFamily("celery_queue_depth", "Messages waiting in the broker queue", labels=["queue"])
+        try:
+            with self._app.connection_for_read() as conn:
+                for name in self._queue_names:
+                    channel = conn.channel()
+                    try:
+                        _, message_count, _ = channel.queue_declare(name, passive=True)
+                        depth.add_metric([name], message_count)
+                    except Exception as e:
+                        logger.debug(f"Queue depth unavailable for {name}: {e}")
+                    finally:
+                        channel.close()
+        except Exception as e:
+            logger.warning(f"Queue depth collection failed: {e}")
+        yield depth
+
+
+def metrics_registry() -> CollectorRegistry:
+    """노출할 레지스트리 (멀티프로세스 모드면 프로세스별 지표를 합산)"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics(registry: Optional[CollectorRegistry] = None) -> Tuple[bytes, str]:
+    """(Prometheus 텍스트 형식 본문, Content-Type)"""
+    return generate_latest(registry or metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def start_worker_exporter(port: int, *collectors) -> None:
+    """워커 메인 프로세스에서 지표 HTTP 서버 시작 (자식 프로세스 생성 전에 호출)"""
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        # 이전 실행에서 남은 프로세스 지표 파일 정리
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(multiproc_dir, "*.db")):
+            os.remove(path)
+    registry = metrics_registry()
+    for collector in collectors:
+        registry.register(collector)
+    start_http_server(port, registry=registry)
+    logger.info(f"Worker metrics exporter listening on :{port}")
+
+
+async def metrics_middleware(request, call_next):
+    """HTTP 요청 지연 기록 (라우트 템플릿 기준)"""
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.labels(
+            request.method,
+            getattr(route, "path", "unmatched"),
+            str(status_code),
+        ).observe(time.perf_counter() - started)
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from typing import Callable, Dict, Optional, Set, Union
+
+import redis.asyncio as redis
+
+from app.core.redis import REDIS_PUBSUB, get_redis_pool
+
+logger = logging.getLogger(__name__)
+
+# 결과 백엔드처럼 바이너리 값을 쓰는 Redis에서는 bytes를 받음
+MessageHandler = Callable[[Union[str, bytes]], None]
+
+
+class PubSubHub:
+    """
+    프로세스당 하나의 Redis pub/sub 커넥션을 공유하는 구독 허브
+
+    채널마다 로컬 핸들러를 등록하고, 첫 핸들러가 붙을 때 SUBSCRIBE,
+    마지막 핸들러가 떨어질 때 UNSUBSCRIBE 합니다.
+    수신 루프는 하나의 태스크에서 돌며 메시지를 로컬 핸들러로 분배합니다.
+    """
+
+    def __init__(self, role: str = REDIS_PUBSUB, poll_timeout: float = 1.0):
+        self._role = role
+        self._poll_timeout = poll_timeout
+        self._client: Optional[redis.Redis] = None
+        self._pubsub: Optional[redis.client.PubSub] = None
+        self._handlers: Dict[str, Set[MessageHandler]] = {}
+        self._lock = asyncio.Lock()
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """pub/sub 커넥션을 열고 수신 루프를 시작"""
+        if self._reader is not None:
+            return
+        self._client = await get_redis_pool(self._role)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.connect()
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def stop(self) -> None:
+        """수신 루프를 종료하고 커넥션을 반환"""
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._handlers.clear()
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        """채널에 로컬 핸들러 등록 (필요할 때만 Redis SUBSCRIBE)"""
+        async with self._lock:
+            handlers = self._handlers.get(channel)
+            if handlers is None:
+                handlers = self._handlers[channel] = set()
+                await self._pubsub.subscribe(channel)
+            handlers.add(handler)
+
+    async def unsubscribe(self, channel: str, handler: MessageHandler) -> None:
+        """로컬 핸들러 해제 (마지막 핸들러면 Redis UNSUBSCRIBE)"""
+        async with self._lock:
+            handlers = self._handlers.get(channel)
+            if handlers is None:
+                return
+            handlers.discard(handler)
+            if not handlers:
+                del self._handlers[channel]
+                if self._pubsub is not None:
+                    await self._pubsub.unsubscribe(channel)
+
+    async def _read_loop(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=self._poll_timeout,
+                )
+            except asyncio.CancelledError:
+                raise
+            except redis.ConnectionError as e:
+                # 재연결 시 redis-py가 기존 채널을 다시 구독함
+                logger.warning(f"PubSub connection lost, retrying: {e}")
+                await asyncio.sleep(self._poll_timeout)
+                continue
+
+            if message is None or message.get("type") != "message":
+                continue
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            self._dispatch(channel, message["data"])
+
+    def _dispatch(self, channel: str, data: Union[str, bytes]) -> None:
+        for handler in list(self._handlers.get(channel, ())):
+            try:
+                handler(data)
+            except Exception as e:
+                logger.error(f"PubSub handler failed for {channel}: {e}", exc_info=True)
+
+
+# 프로세스 전역 허브 (Redis 용도별로 한 번만 생성)
+_pubsub_hubs: Dict[str, PubSubHub] = {}
+
+def get_pubsub_hub(role: str = REDIS_PUBSUB) -> PubSubHub:
+    """용도별 공유 pub/sub 허브를 반환 (싱글톤 패턴)"""
+    hub = _pubsub_hubs.get(role)
+    if hub is None:
+        hub = _pubsub_hubs[role] = PubSubHub(role)
+    return hub
+
+
+async def publish_message(channel: str, data: str) -> None:
+    """pub/sub용 Redis로 메시지 발행"""
+    redis_client = await get_redis_pool(REDIS_PUBSUB)
+    try:
+        await redis_client.publish(channel, data)
+    finally:
+        await redis_client.aclose()
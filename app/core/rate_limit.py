@@ -0,0 +1,107 @@
+"""
+사용자별 토큰 버킷 요청 제한
+
+버킷은 세션 Redis의 해시(rate_limit:{endpoint_class}:{user_id})에 두고,
+충전/차감은 Lua 스크립트 한 번으로 처리하므로 API 인스턴스가 여러 개여도 한도를 공유합니다.
+한도를 넘으면 태스크를 브로커에 넣기 전에 429와 Retry-After를 반환합니다.
+"""
+import logging
+import math
+from typing import Callable, Tuple
+
+import redis.asyncio as redis
+from fastapi import Depends, HTTPException, status
+
+from app.core.config import settings
+from app.core.dependencies import get_redis_client
+from app.core.security import get_current_user_id
+
+logger = logging.getLogger(__name__)
+
+# 엔드포인트 종류 (종류마다 버킷을 따로 둠)
+RATE_LIMIT_MESSAGE = "message"
+RATE_LIMIT_FEEDBACK = "feedback"
+RATE_LIMIT_RESULT = "result"
+
+# 버킷 충전 후 토큰 차감 (시각은 Redis 서버 시간 사용, 재시도 대기 시간은 밀리초)
+_TAKE_TOKEN_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = math.ceil((cost - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return {allowed, retry_after}
+"""
+
+
+def rate_limit_key(endpoint_class: str, user_id: int) -> str:
+    return f"rate_limit:{endpoint_class}:{user_id}"
+
+
+def bucket_settings(endpoint_class: str) -> Tuple[int, float]:
+    """(버킷 크기, 초당 충전 토큰 수)"""
+    if endpoint_class == RATE_LIMIT_MESSAGE:
+        return settings.RATE_LIMIT_MESSAGE_BURST, settings.RATE_LIMIT_MESSAGE_PER_MINUTE / 60
+    if endpoint_class == RATE_LIMIT_FEEDBACK:
+        return settings.RATE_LIMIT_FEEDBACK_BURST, settings.RATE_LIMIT_FEEDBACK_PER_MINUTE / 60
+    if endpoint_class == RATE_LIMIT_RESULT:
+        return settings.RATE_LIMIT_RESULT_BURST, settings.RATE_LIMIT_RESULT_PER_MINUTE / 60
+    raise ValueError(f"Unknown rate limit class: {endpoint_class}")
+
+
+async def take_token(
+    redis_client: redis.Redis, endpoint_class: str, user_id: int, cost: int = 1
+) -> Tuple[bool, float]:
+    """
+    버킷에서 토큰 차감
+
+    Returns:
+        (허용 여부, 거절된 경우 다시 시도할 수 있을 때까지 남은 초)
+    """
+    capacity, rate = bucket_settings(endpoint_class)
+    script = redis_client.register_script(_TAKE_TOKEN_SCRIPT)
+    allowed, retry_after_ms = await script(
+        keys=[rate_limit_key(endpoint_class, user_id)],
+        args=[capacity, rate, cost],
+    )
+    return bool(allowed), int(retry_after_ms) / 1000
+
+
+def rate_limit(endpoint_class: str) -> Callable:
+    """엔드포인트 종류별 요청 제한 의존성 (한도 초과 시 429)"""
+    bucket_settings(endpoint_class)
+
+    async def dependency(
+        user_id: int = Depends(get_current_user_id),
+        redis_client: redis.Redis = Depends(get_redis_client),
+    ) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        try:
+            allowed, retry_after = await take_token(redis_client, endpoint_class, user_id)
+        except redis.RedisError as e:
+            # Redis 장애 시에는 제한 없이 통과 (요청 처리 자체를 막지 않음)
+            logger.warning(f"Rate limit check failed for {endpoint_class}:{user_id}: {e}")
+            return
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    return dependency
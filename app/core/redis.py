@@ -1,42 +1,101 @@
+from typing import Dict
+
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
 from app.core.config import settings
+from app.core.metrics import REDIS_ROUND_TRIPS
+from app.core.tracing import leaf_span
+
+# Redis 용도 (용도마다 대상 URL과 커넥션 풀을 따로 둠)
+REDIS_SESSION = "session"    # 세션 상태, 피드백, 멱등성 키, 토큰 블랙리스트
+REDIS_MEMORY = "memory"      # 대화 메모리 (요약 포함)
+REDIS_PUBSUB = "pubsub"      # 채팅/캐시 무효화 채널
+REDIS_RESULTS = "results"    # Celery 결과 백엔드, 응답 캐시
+
+# 바이너리 값(msgpack)을 저장하므로 응답을 문자열로 디코딩하지 않는 용도
+_BINARY_ROLES = (REDIS_MEMORY, REDIS_RESULTS)
+
 
-# 비동기 Redis 커넥션 풀 (애플리케이션 시작 시 한 번만 생성)
-_async_redis_pool: redis.ConnectionPool = None
+def redis_url(role: str) -> str:
+    """용도별 Redis URL (따로 지정하지 않으면 결과 백엔드와 같은 Redis 사용)"""
+    if role == REDIS_SESSION:
+        return settings.REDIS_SESSION_URL or settings.CELERY_RESULT_BACKEND
+    if role == REDIS_MEMORY:
+        return settings.REDIS_MEMORY_URL or settings.CELERY_RESULT_BACKEND
+    if role == REDIS_PUBSUB:
+        return settings.REDIS_PUBSUB_URL or settings.CELERY_RESULT_BACKEND
+    if role == REDIS_RESULTS:
+        return settings.CELERY_RESULT_BACKEND
+    raise ValueError(f"Unknown Redis role: {role}")
 
-def get_async_redis_pool() -> redis.ConnectionPool:
-    """비동기 Redis 커넥션 풀을 반환 (싱글톤 패턴)"""
-    global _async_redis_pool
-    if _async_redis_pool is None:
-        _async_redis_pool = redis.ConnectionPool.from_url(
-            settings.CELERY_RESULT_BACKEND,
+
+# 비동기 Redis 커넥션 풀 (용도별로 한 번만 생성)
+_async_redis_pools: Dict[str, redis.ConnectionPool] = {}
+
+def get_async_redis_pool(role: str = REDIS_SESSION) -> redis.ConnectionPool:
+    """용도별 비동기 Redis 커넥션 풀을 반환 (싱글톤 패턴)"""
+    pool = _async_redis_pools.get(role)
+    if pool is None:
+        pool = _async_redis_pools[role] = redis.ConnectionPool.from_url(
+            redis_url(role),
             encoding="utf-8",
-            decode_responses=True
+            decode_responses=role not in _BINARY_ROLES
         )
-    return _async_redis_pool
+    return pool
+
+class InstrumentedPipeline(Pipeline):
+    """실행 한 번을 왕복 한 번으로 집계/추적하는 파이프라인"""
+
+    metrics_role = REDIS_SESSION
+
+    async def execute(self, raise_on_error: bool = True):
+        if not self.command_stack:
+            return await super().execute(raise_on_error)
+        REDIS_ROUND_TRIPS.labels(self.metrics_role, "pipeline").inc()
+        with leaf_span("redis pipeline", role=self.metrics_role, commands=len(self.command_stack)):
+            return await super().execute(raise_on_error)
+
+
+class InstrumentedRedis(redis.Redis):
+    """용도별 Redis 왕복 횟수를 지표/추적 구간으로 남기는 클라이언트"""
+
+    metrics_role = REDIS_SESSION
+
+    async def execute_command(self, *args, **options):
+        REDIS_ROUND_TRIPS.labels(self.metrics_role, "command").inc()
+        with leaf_span(f"redis {args[0]}", role=self.metrics_role):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> InstrumentedPipeline:
+        pipe = InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+        pipe.metrics_role = self.metrics_role
+        return pipe
+
 
 # 비동기 Redis (FastAPI용)
-async def get_redis_pool():
-    pool = get_async_redis_pool()
-    return redis.Redis(connection_pool=pool)
+async def get_redis_pool(role: str = REDIS_SESSION):
+    pool = get_async_redis_pool(role)
+    client = InstrumentedRedis(connection_pool=pool)
+    client.metrics_role = role
+    return client
 
 # 동기 Redis 커넥션 풀 (Celery용)
 import redis as sync_redis
 
-_sync_redis_pool: sync_redis.ConnectionPool = None
+_sync_redis_pools: Dict[str, sync_redis.ConnectionPool] = {}
 
-def get_sync_redis_pool() -> sync_redis.ConnectionPool:
-    """동기 Redis 커넥션 풀을 반환 (싱글톤 패턴)"""
-    global _sync_redis_pool
-    if _sync_redis_pool is None:
-        _sync_redis_pool = sync_redis.ConnectionPool.from_url(
-            settings.CELERY_RESULT_BACKEND,
+def get_sync_redis_pool(role: str = REDIS_SESSION) -> sync_redis.ConnectionPool:
+    """용도별 동기 Redis 커넥션 풀을 반환 (싱글톤 패턴)"""
+    pool = _sync_redis_pools.get(role)
+    if pool is None:
+        pool = _sync_redis_pools[role] = sync_redis.ConnectionPool.from_url(
+            redis_url(role),
             encoding="utf-8",
-            decode_responses=True
+            decode_responses=role not in _BINARY_ROLES
         )
-    return _sync_redis_pool
+    return pool
 
-def get_sync_redis():
+def get_sync_redis(role: str = REDIS_SESSION):
     """동기 Redis 클라이언트 반환"""
-    pool = get_sync_redis_pool()
-    return sync_redis.Redis(connection_pool=pool)
\ No newline at end of file
+    pool = get_sync_redis_pool(role)
+    return sync_redis.Redis(connection_pool=pool)
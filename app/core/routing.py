@@ -0,0 +1,80 @@
+from typing import Dict, List, Tuple
+
+from app.core.config import settings
+
+
+def jump_consistent_hash(key: int, num_buckets: int) -> int:
+    """
+    Jump consistent hash (Lamping & Veach)
+
+    버킷 수가 바뀌어도 대부분의 키가 같은 버킷에 남습니다.
+    """
+    key &= 0xFFFFFFFFFFFFFFFF
+    bucket, next_bucket = -1, 0
+    while next_bucket < num_buckets:
+        bucket = next_bucket
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        next_bucket = int((bucket + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return bucket
+
+
+def chat_shard_for_user(user_id: int) -> int:
+    """사용자 ID로 채팅 샤드 번호 계산"""
+    return jump_consistent_hash(user_id, settings.CHAT_QUEUE_SHARDS)
+
+
+def chat_queue_for_user(user_id: int) -> str:
+    """
+    사용자 채팅 태스크를 보낼 큐 이름
+
+    샤드를 쓰지 않으면(CHAT_QUEUE_SHARDS=0) 공용 채팅 큐를 반환합니다.
+    """
+    if settings.CHAT_QUEUE_SHARDS <= 0:
+        return settings.CELERY_CHAT_QUEUE
+    return f"{settings.CHAT_QUEUE_PREFIX}.{chat_shard_for_user(user_id)}"
+
+
+def chat_shard_queues() -> List[str]:
+    """선언해야 할 채팅 샤드 큐 이름 목록"""
+    return [
+        f"{settings.CHAT_QUEUE_PREFIX}.{shard}"
+        for shard in range(max(settings.CHAT_QUEUE_SHARDS, 0))
+    ]
+
+
+# 태스크별 (큐 설정 이름, 우선순위). 우선순위는 같은 큐 안에서만 의미가 있고 클수록 먼저 처리됩니다.
+CHAT_TASK = "app.domain.LLM.task.get_llm_message"
+TASK_ROUTES: Dict[str, Tuple[str, int]] = {
+    CHAT_TASK: ("CELERY_CHAT_QUEUE", 9),
+    "app.domain.LLM.task.get_gpt_feedback": ("CELERY_FEEDBACK_QUEUE", 6),
+    "app.domain.LLM.task.get_gpt_result": ("CELERY_RESULT_QUEUE", 5),
+    "app.domain.LLM.task.finalize_session": ("CELERY_RESULT_QUEUE", 5),
+    "app.domain.LLM.task.fold_feedback": ("CELERY_RESULT_QUEUE", 3),
+    # 대화 압축은 최종 결과 생성보다 뒤로 밀려도 됨
+    "app.domain.LLM.task.compact_conversation_memory": ("CELERY_RESULT_QUEUE", 1),
+}
+
+
+def route_llm_task(name, args, kwargs, options, task=None, **kw):
+    """
+    Celery 라우터: LLM 태스크를 성격별 큐로 보냄
+
+    느린 결과/요약 작업이 쌓여도 채팅 응답이 같은 큐에서 기다리지 않도록
+    채팅/피드백/결과 큐를 나누고, 워커 프로필마다 담당 큐만 소비합니다.
+        celery -A app.core.celery_app.celery_app worker -Q llm.chat
+
+    채팅 샤드를 쓰면(CHAT_QUEUE_SHARDS > 0) 채팅 태스크는 사용자 샤드 큐로 갑니다.
+    샤드 큐(llm.chat.0 ~ llm.chat.N-1)마다 워커 하나가 소비하도록 띄우면
+    같은 사용자의 턴은 항상 같은 워커로 가서 워커 로컬 대화 기록 캐시를 재사용합니다.
+        celery -A app.core.celery_app.celery_app worker -Q llm.chat.0
+    턴 처리 순서는 샤드와 관계없이 턴 번호로 보장합니다 (task.get_llm_message).
+    """
+    route = TASK_ROUTES.get(name)
+    if route is None:
+        return None
+    queue_setting, priority = route
+
+    queue = getattr(settings, queue_setting)
+    if name == CHAT_TASK and kwargs:
+        queue = chat_queue_for_user(kwargs["user_id"])
+    return {"queue": queue, "priority": priority}
@@ -62,11 +62,8 @@ def decode_token(token: str, token_type: str = "access") -> dict:
         )
 
 
-async def get_current_user_id(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> int:
-    """현재 인증된 사용자의 ID를 반환합니다."""
-    token = credentials.credentials
+def get_user_id_from_token(token: str) -> int:
+    """Access Token에서 사용자 ID를 추출합니다."""
     payload = decode_token(token, "access")
     
     sub = payload.get("sub")
@@ -84,4 +81,11 @@ async def get_current_user_id(
             detail="Invalid token: subject must be an integer."
         )
     
-    return user_id
\ No newline at end of file
+    return user_id
+
+
+async def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> int:
+    """현재 인증된 사용자의 ID를 반환합니다."""
+    return get_user_id_from_token(credentials.credentials)
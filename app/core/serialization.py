@@ -0,0 +1,54 @@
+"""
+msgpack + 임계값 압축 직렬화
+
+Celery 태스크/결과 페이로드와 대화 메모리에 공통으로 사용합니다.
+첫 바이트가 형식 헤더이고(0: 그대로, 1: zlib 압축) 나머지가 msgpack 본문입니다.
+"""
+import zlib
+from typing import Any
+
+import msgpack
+from kombu.serialization import register
+
+from app.core.config import settings
+
+# kombu에 등록하는 직렬화 이름
+SERIALIZER_NAME = "msgpackz"
+CONTENT_TYPE = "application/x-msgpackz"
+
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+
+
+def dumps(obj: Any) -> bytes:
+    """객체를 msgpack으로 직렬화 (임계값보다 크면 zlib 압축)"""
+    body = msgpack.packb(obj, use_bin_type=True)
+    threshold = settings.SERIALIZER_COMPRESSION_THRESHOLD_BYTES
+    if 0 < threshold <= len(body):
+        compressed = zlib.compress(body, settings.SERIALIZER_COMPRESSION_LEVEL)
+        if len(compressed) < len(body):
+            return _ZLIB + compressed
+    return _RAW + body
+
+
+def loads(data: bytes) -> Any:
+    """dumps로 만든 바이트를 객체로 복원"""
+    if isinstance(data, str):
+        data = data.encode("latin-1")
+    header, body = data[:1], data[1:]
+    if header == _ZLIB:
+        body = zlib.decompress(body)
+    elif header != _RAW:
+        raise ValueError(f"Unknown serialization header: {header!r}")
+    return msgpack.unpackb(body, raw=False)
+
+
+def register_kombu_serializer() -> None:
+    """Celery 메시지/결과에 쓸 수 있도록 kombu에 등록"""
+    register(
+        SERIALIZER_NAME,
+        dumps,
+        loads,
+        content_type=CONTENT_TYPE,
+        content_encoding="binary",
+    )
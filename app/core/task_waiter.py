@@ -0,0 +1,112 @@
+import asyncio
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Optional
+
+from celery import states
+
+from app.core.celery_app import celery_app
+from app.core.pubsub import get_pubsub_hub
+from app.core.redis import REDIS_RESULTS, get_redis_pool
+
+# pub/sub 알림을 놓친 경우를 대비한 결과 백엔드 재확인 주기 (초)
+FALLBACK_CHECK_INTERVAL = 5.0
+
+
+class TaskFailedError(Exception):
+    """Celery 태스크가 실패 상태로 끝난 경우"""
+
+    def __init__(self, task_id: str, status: str, result: Any):
+        super().__init__(f"Task {task_id} finished with {status}: {result}")
+        self.task_id = task_id
+        self.status = status
+        self.result = result
+
+
+def _task_meta_key(task_id: str) -> str:
+    """결과 백엔드의 태스크 메타 키 (Redis 백엔드는 같은 이름의 채널로도 발행)"""
+    key = celery_app.backend.get_key_for_task(task_id)
+    return key.decode() if isinstance(key, bytes) else key
+
+
+async def _read_task_meta(key: str) -> Optional[dict]:
+    redis_client = await get_redis_pool(REDIS_RESULTS)
+    try:
+        payload = await redis_client.get(key)
+    finally:
+        await redis_client.aclose()
+    if payload is None:
+        return None
+    return celery_app.backend.decode_result(payload)
+
+
+async def get_task_meta(task_id: str) -> Optional[dict]:
+    """결과 백엔드의 현재 태스크 메타 (아직 기록이 없으면 None)"""
+    return await _read_task_meta(_task_meta_key(task_id))
+
+
+async def watch_task(task_id: str, timeout: float) -> AsyncIterator[Optional[dict]]:
+    """
+    Celery 태스크 상태가 바뀔 때마다 태스크 메타({"status", "result", ...})를 내보냄
+
+    결과 백엔드에 아직 아무것도 없으면 PENDING 메타를 먼저 내보내고,
+    완료 상태(SUCCESS/FAILURE 등)를 내보낸 뒤 끝납니다.
+    FALLBACK_CHECK_INTERVAL 동안 변화가 없으면 None을 내보냅니다 (연결 유지용).
+
+    Raises:
+        asyncio.TimeoutError: timeout 안에 완료되지 않은 경우
+    """
+    key = _task_meta_key(task_id)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_message(data: str) -> None:
+        queue.put_nowait(celery_app.backend.decode_result(data))
+
+    # 태스크 메타 알림은 결과 백엔드 Redis에서 발행됨
+    hub = get_pubsub_hub(REDIS_RESULTS)
+    await hub.subscribe(key, on_message)
+    try:
+        deadline = time.monotonic() + timeout
+        # 구독 전에 이미 바뀌었을 수 있으므로 한 번 직접 확인
+        meta = await _read_task_meta(key) or {"status": states.PENDING, "result": None}
+        last_status = None
+        while True:
+            if meta and meta["status"] != last_status:
+                last_status = meta["status"]
+                yield meta
+                if last_status in states.READY_STATES:
+                    return
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError(f"Task {task_id} did not finish within {timeout}s")
+            try:
+                meta = await asyncio.wait_for(queue.get(), timeout=min(remaining, FALLBACK_CHECK_INTERVAL))
+            except asyncio.TimeoutError:
+                # 알림을 놓친 경우를 대비해 주기적으로 재확인
+                meta = await _read_task_meta(key)
+                if meta is None or meta["status"] == last_status:
+                    yield None
+    finally:
+        await hub.unsubscribe(key, on_message)
+
+
+async def wait_for_task_result(task_id: str, timeout: float) -> Any:
+    """
+    Celery 태스크 완료를 기다린 뒤 결과를 반환
+
+    Redis 결과 백엔드가 결과 저장 시 발행하는 알림을 공유 pub/sub 허브로 받으므로
+    대기 중에 스레드를 점유하지 않습니다.
+
+    Raises:
+        asyncio.TimeoutError: timeout 안에 완료되지 않은 경우
+        TaskFailedError: 태스크가 실패한 경우
+    """
+    async with aclosing(watch_task(task_id, timeout)) as updates:
+        async for meta in updates:
+            if meta and meta["status"] in states.READY_STATES:
+                break
+
+    if meta["status"] != states.SUCCESS:
+        raise TaskFailedError(task_id, meta["status"], meta["result"])
+    return meta["result"]
@@ -0,0 +1,368 @@
+"""
+요청 추적 (trace context 전파)
+
+API 요청마다 trace ID를 만들고(또는 traceparent 헤더를 이어받고) Celery 태스크 헤더로 넘겨,
+한 사용자 턴의 HTTP 요청 -> 태스크 -> DB/Redis/LLM 호출 -> PUBLISH를 하나의 추적으로 묶습니다.
+헤더는 W3C traceparent 형식을 사용하고, 스팬은 TRACE_EXPORTER 설정에 따라
+JSONL 파일이나 Zipkin 호환 수집기로 내보냅니다.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+TRACE_ID_RESPONSE_HEADER = "X-Trace-Id"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    """추적 구간 하나"""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    sampled: bool = True
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start_time: float = field(default_factory=time.time)
+    duration: Optional[float] = None
+    error: Optional[str] = None
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """구간 종료 후 내보내기 (샘플링된 경우만)"""
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        exporter = get_span_exporter()
+        if self.sampled and exporter is not None:
+            exporter.export(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": settings.TRACE_SERVICE_NAME,
+            "start": self.start_time,
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+def _new_id(length: int) -> str:
+    return os.urandom(length // 2).hex()
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """traceparent 헤더 해석 -> (trace ID, 부모 span ID, 샘플링 여부), 형식이 틀리면 None"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span is not None else None
+
+
+def new_span(name: str, traceparent: Optional[str] = None, **attributes: Any) -> Span:
+    """
+    새 구간 생성 (활성화하지 않음)
+
+    traceparent가 있으면 그 추적을 이어받고, 없으면 현재 구간의 자식,
+    현재 구간도 없으면 새 추적을 시작합니다 (샘플링은 추적 시작 시 결정).
+    """
+    remote = parse_traceparent(traceparent)
+    if remote is not None:
+        trace_id, parent_id, sampled = remote
+    else:
+        parent = _current_span.get()
+        if parent is not None:
+            trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+        else:
+            trace_id, parent_id = _new_id(32), None
+            sampled = random.random() < settings.TRACE_SAMPLE_RATE
+    return Span(
+        name=name,
+        trace_id=trace_id,
+        span_id=_new_id(16),
+        parent_id=parent_id,
+        sampled=sampled,
+        attributes=dict(attributes),
+    )
+
+
+def activate(span: Span) -> Token:
+    """구간을 현재 구간으로 지정 (deactivate로 되돌림)"""
+    return _current_span.set(span)
+
+
+def deactivate(token: Token) -> None:
+    _current_span.reset(token)
+
+
+@contextmanager
+def start_span(name: str, **attributes: Any) -> Iterator[Span]:
+    """현재 구간의 자식 구간을 열고 블록 동안 현재 구간으로 지정"""
+    span = new_span(name, **attributes)
+    token = activate(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.finish(error=e)
+        raise
+    finally:
+        deactivate(token)
+        span.finish()
+
+
+@contextmanager
+def leaf_span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    하위 구간이 없는 호출(DB/Redis 명령 등)용 구간
+
+    기록 중인 추적 안에서만 만들고, 그 밖에서는 아무것도 하지 않습니다.
+    """
+    parent = _current_span.get()
+    if parent is None or not parent.sampled or get_span_exporter() is None:
+        yield None
+        return
+    span = new_span(name, **attributes)
+    try:
+        yield span
+    except BaseException as e:
+        span.finish(error=e)
+        raise
+    finally:
+        span.finish()
+
+
+class FileSpanExporter:
+    """스팬을 JSONL 파일에 한 줄씩 기록"""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self._path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class ZipkinSpanExporter:
+    """
+    Zipkin v2 JSON 형식으로 수집기에 전송 (Zipkin, Jaeger, OpenTelemetry Collector 호환)
+
+    요청 경로를 막지 않도록 큐에 넣고 백그라운드 스레드가 모아서 보냅니다.
+    """
+
+    def __init__(self, url: str, batch_size: int = 100, flush_interval: float = 1.0):
+        self._url = url
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=10000)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            pass
+
+    def _ensure_thread(self) -> None:
+        # fork 이후 자식 프로세스에서는 스레드를 다시 시작
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        import requests
+
+        while True:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self._flush_interval
+            while len(batch) < self._batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if not batch:
+                continue
+            try:
+                requests.post(self._url, json=[self._to_zipkin(span) for span in batch], timeout=2)
+            except Exception as e:
+                logger.warning(f"Span export failed ({len(batch)} spans dropped): {e}")
+
+    @staticmethod
+    def _to_zipkin(span: Span) -> Dict[str, Any]:
+        payload = {
+            "traceId": span.trace_id,
+            "id": span.span_id,
+            "name": span.name,
+            "timestamp": int(span.start_time * 1_000_000),
+            "duration": max(1, int((span.duration or 0) * 1_000_000)),
+            "localEndpoint": {"serviceName": settings.TRACE_SERVICE_NAME},
+            "tags": {key: str(value) for key, value in span.attributes.items()},
+        }
+        if span.parent_id:
+            payload["parentId"] = span.parent_id
+        if span.error:
+            payload["tags"]["error"] = span.error
+        return payload
+
+
+# 프로세스 전역 내보내기 (설정이 비어 있으면 None)
+_span_exporter = None
+_span_exporter_loaded = False
+
+def get_span_exporter():
+    """설정에 맞는 스팬 내보내기 반환 (싱글톤 패턴)"""
+    global _span_exporter, _span_exporter_loaded
+    if not _span_exporter_loaded:
+        if settings.TRACE_EXPORTER == "file":
+            _span_exporter = FileSpanExporter(settings.TRACE_FILE_PATH)
+        elif settings.TRACE_EXPORTER == "zipkin":
+            _span_exporter = ZipkinSpanExporter(settings.TRACE_COLLECTOR_URL)
+        elif settings.TRACE_EXPORTER:
+            raise ValueError(f"Unknown trace exporter: {settings.TRACE_EXPORTER}")
+        _span_exporter_loaded = True
+    return _span_exporter
+
+
+def trace_engine(engine: Engine) -> None:
+    """SQL 실행마다 구간 기록"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query_span(conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        if parent is None or not parent.sampled or get_span_exporter() is None:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        conn.info.setdefault("trace_spans", []).append(new_span(f"db {operation}", statement=statement[:200]))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish_query_span(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            spans.pop().finish()
+
+    @event.listens_for(engine, "handle_error")
+    def _fail_query_span(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get("trace_spans") if conn is not None else None
+        if spans:
+            spans.pop().finish(error=exception_context.original_exception)
+
+
+# Celery 태스크 추적 (발행 시 현재 구간을 헤더로 전달, 실행 시 이어받음)
+_task_spans: Dict[str, Tuple[Span, Token]] = {}
+
+
+@before_task_publish.connect
+def _inject_trace_header(headers=None, **kwargs):
+    span = _current_span.get()
+    if headers is not None and span is not None:
+        headers.setdefault(TRACEPARENT_HEADER, span.traceparent)
+
+
+@task_prerun.connect
+def _start_task_span(task_id=None, task=None, **kwargs):
+    span = new_span(
+        f"task {task.name}",
+        traceparent=getattr(task.request, TRACEPARENT_HEADER, None),
+        task_id=task_id,
+        queue=(task.request.delivery_info or {}).get("routing_key"),
+    )
+    _task_spans[task_id] = (span, activate(span))
+
+
+@task_postrun.connect
+def _finish_task_span(task_id=None, state=None, retval=None, **kwargs):
+    entry = _task_spans.pop(task_id, None)
+    if entry is None:
+        return
+    span, token = entry
+    span.set_attribute("state", state)
+    deactivate(token)
+    span.finish(error=retval if isinstance(retval, BaseException) else None)
+
+
+async def tracing_middleware(request, call_next):
+    """요청마다 추적 시작 (traceparent 헤더가 있으면 이어받음), 응답에 X-Trace-Id 추가"""
+    span = new_span(
+        f"HTTP {request.method}",
+        traceparent=request.headers.get(TRACEPARENT_HEADER),
+        method=request.method,
+        path=request.url.path,
+    )
+    token = activate(span)
+    error = None
+    try:
+        response = await call_next(request)
+        response.headers[TRACE_ID_RESPONSE_HEADER] = span.trace_id
+        span.set_attribute("status", response.status_code)
+        return response
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        route = request.scope.get("route")
+        if route is not None:
+            span.name = f"HTTP {request.method} {route.path}"
+        deactivate(token)
+        span.finish(error=error)
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.cache import LocalTTLCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import record_cache
+from app.core.pubsub import get_pubsub_hub
+from app.core.redis import REDIS_PUBSUB, get_sync_redis
+from app.domain.character.model import CharacterInfo
+from app.domain.character.repository import CharacterRepository
+from app.domain.episode.model import Episode
+from app.domain.episode.repository import EpisodeRepository
+
+logger = logging.getLogger(__name__)
+
+# 캐릭터/에피소드 변경 알림 채널
+CATALOG_INVALIDATION_CHANNEL = "catalog_invalidation"
+
+# 프롬프트용 정적 데이터 캐시 (프로세스 로컬)
+_catalog_cache = LocalTTLCache(
+    max_size=settings.CATALOG_CACHE_MAX_SIZE,
+    ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+)
+
+_listener_started = False
+_listener_lock = asyncio.Lock()
+
+
+def _on_invalidation(data: str) -> None:
+    payload = json.loads(data)
+    if payload.get("kind") == "all":
+        _catalog_cache.clear()
+    else:
+        _catalog_cache.delete((payload["kind"], payload["id"]))
+
+
+async def _ensure_invalidation_listener() -> None:
+    """현재 프로세스에서 무효화 채널 구독 (최초 1회)"""
+    global _listener_started
+    if _listener_started:
+        return
+    async with _listener_lock:
+        if _listener_started:
+            return
+        try:
+            hub = get_pubsub_hub()
+            await hub.start()
+            await hub.subscribe(CATALOG_INVALIDATION_CHANNEL, _on_invalidation)
+            _listener_started = True
+        except Exception as e:
+            # 구독 실패 시에도 TTL로 갱신되므로 조회는 계속 진행
+            logger.warning(f"Catalog invalidation listener not started: {e}")
+
+
+def _load_episode_content(episode_id: int) -> str:
+    db = SessionLocal()
+    try:
+        episode = EpisodeRepository.get_by_id(db, episode_id)
+        if not episode:
+            raise ValueError(f"Episode not found for episode_id={episode_id}")
+        return episode.content
+    finally:
+        db.close()
+
+
+def _load_character_script(character_id: int) -> str:
+    db = SessionLocal()
+    try:
+        character = CharacterRepository.get_by_id(db, character_id)
+        if not character:
+            raise ValueError(f"Character not found for character_id={character_id}")
+        return character.script
+    finally:
+        db.close()
+
+
+async def get_episode_content(episode_id: int) -> str:
+    """에피소드 내용 조회 (캐시 미스일 때만 DB 조회)"""
+    await _ensure_invalidation_listener()
+    key = ("episode", episode_id)
+    content = _catalog_cache.get(key)
+    record_cache("catalog", content is not None)
+    if content is None:
+        content = await asyncio.to_thread(_load_episode_content, episode_id)
+        _catalog_cache.set(key, content)
+    return content
+
+
+async def get_character_script(character_id: int) -> str:
+    """캐릭터 스크립트 조회 (캐시 미스일 때만 DB 조회)"""
+    await _ensure_invalidation_listener()
+    key = ("character", character_id)
+    script = _catalog_cache.get(key)
+    record_cache("catalog", script is not None)
+    if script is None:
+        script = await asyncio.to_thread(_load_character_script, character_id)
+        _catalog_cache.set(key, script)
+    return script
+
+
+def invalidate_catalog(kind: str, item_id: int = None) -> None:
+    """
+    모든 프로세스의 카탈로그 캐시 무효화
+
+    Args:
+        kind: "character", "episode" 또는 전체 무효화 시 "all"
+        item_id: 대상 행 ID
+    """
+    redis_client = get_sync_redis(REDIS_PUBSUB)
+    try:
+        redis_client.publish(
+            CATALOG_INVALIDATION_CHANNEL,
+            json.dumps({"kind": kind, "id": item_id}),
+        )
+    finally:
+        redis_client.close()
+
+
+# ORM으로 행이 바뀌면 커밋 후 무효화 알림 발행
+# (flush 시점에 보내면 커밋 전에 다른 프로세스가 옛 값을 다시 캐시할 수 있음)
+_PENDING_INVALIDATIONS = "catalog_invalidations"
+
+
+def _queue_invalidation(target, kind: str) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_INVALIDATIONS, set()).add((kind, target.id))
+
+
+@event.listens_for(CharacterInfo, "after_update")
+@event.listens_for(CharacterInfo, "after_delete")
+def _character_changed(mapper, connection, target):
+    _queue_invalidation(target, "character")
+
+
+@event.listens_for(Episode, "after_update")
+@event.listens_for(Episode, "after_delete")
+def _episode_changed(mapper, connection, target):
+    _queue_invalidation(target, "episode")
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_invalidations(session):
+    for kind, item_id in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        try:
+            invalidate_catalog(kind, item_id)
+        except Exception as e:
+            # 커밋은 이미 끝났으므로 알림 실패는 기록만 (TTL이 지나면 갱신됨)
+            logger.warning(f"Catalog invalidation for {kind} {item_id} failed: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session):
+    session.info.pop(_PENDING_INVALIDATIONS, None)
@@ -0,0 +1,179 @@
+import json
+from typing import List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.pubsub import publish_message
+from app.core.keyspace import (
+    feedback_folded_key,
+    feedback_folding_key,
+    feedback_partials_key,
+    feedback_turns_key,
+    feedbacks_key,
+    session_key,
+)
+from app.domain.LLM.provider import get_llm_provider
+
+# 부분 요약 반영: 접기 시작 시점의 위치가 그대로이고 해당 구간이 아직 있을 때만 저장
+# (세션 종료로 키가 정리된 뒤 늦게 끝난 접기 결과는 버림)
+_APPLY_FOLD_SCRIPT = """
+local folded = tonumber(redis.call('GET', KEYS[3]) or '0')
+if folded ~= tonumber(ARGV[1]) then
+    return 0
+end
+if redis.call('LLEN', KEYS[1]) < folded + tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('RPUSH', KEYS[2], ARGV[3])
+redis.call('SET', KEYS[3], folded + tonumber(ARGV[2]))
+return 1
+"""
+
+# 턴 피드백 저장: 생성을 시작한 세션이 그대로이고 해당 턴까지 진행됐을 때만 저장
+# (세션 종료로 키가 정리된 뒤 늦게 끝난 결과가 다음 세션 피드백으로 쓰이지 않도록)
+_STORE_TURN_FEEDBACK_SCRIPT = """
+local session = redis.call('HMGET', KEYS[1], 'sid', 'count')
+if not session[1] or session[1] ~= ARGV[1] then
+    return 0
+end
+if tonumber(session[2] or '0') < tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+return 1
+"""
+
+
+async def generate_feedback(character_script: str, episode_content: str, conversation_history: List[dict]) -> str:
+    """대화 내역에서 사용자 답변에 대한 피드백 생성 (기본: GPT-4o)"""
+    # 대화 내역을 문자열로 변환 (프롬프트에 사용하기 위해)
+    conversation_text = "\n".join([
+        f"{msg['role']}: {msg['content']}"
+        for msg in conversation_history
+    ])
+
+    response = await get_llm_provider("feedback").generate(
+        [
+            {
+                "role": "system",
+                "content": f"""
+                conversation : {conversation_text}
+                You are character with {character_script}. In {episode_content}, Look at this conversation and give the feedback.\
+                Give me feedback on the answer\
+                You must give feedback only to user's answer.\
+                Feedback means scolding a person for what he or she did well and what he or she didn't do in his or her answer and telling him or her how to say it.\
+                You have to give "user" a stinging piece of advice in that conversation\
+                You need to see the answer of "user" in that conversation and give feedback.\
+                You have to speak strongly so that you can come to your senses.\
+                You must provide answer in Korean.\
+                Don't generate the questions given earlier, just generate the answers.\
+                When you generating an answer, don't explain the answer or question in advance, just create an answer.\
+                Generate answers in 90 Korean characters.\
+                When you answer, don't use numbers like 1, 2, 3 and use conjunctions to make the flow of the text natural.\
+                """
+            },
+        ],
+    )
+    return response.text
+
+
+async def deliver_feedback(redis_client: redis.Redis, user_email: str, user_id: int, feedback: str) -> int:
+    """피드백을 세션 피드백 목록에 추가하고 chat_{user_id} 채널로 발행 (쌓인 피드백 수 반환)"""
+    feedback_count = await redis_client.rpush(feedbacks_key(user_email), feedback)
+
+    message_data = {
+        "type": "gpt_feedback_message",
+        "message": feedback,
+    }
+    await publish_message(f"chat_{user_id}", json.dumps(message_data))
+    return feedback_count
+
+
+async def claim_feedback_fold(redis_client: redis.Redis, user_email: str, feedback_count: int) -> bool:
+    """접지 않은 피드백이 한 묶음 이상이면 접기 작업 선점 (사용자당 하나만)"""
+    folded = int(await redis_client.get(feedback_folded_key(user_email)) or 0)
+    if feedback_count - folded < settings.FEEDBACK_FOLD_CHUNK_SIZE:
+        return False
+    return bool(await redis_client.set(feedback_folding_key(user_email), 1, nx=True, ex=300))
+
+
+async def release_feedback_fold(redis_client: redis.Redis, user_email: str) -> None:
+    await redis_client.delete(feedback_folding_key(user_email))
+
+
+async def next_fold_chunk(redis_client: redis.Redis, user_email: str) -> Tuple[int, List[str]]:
+    """(접힌 위치, 다음에 접을 피드백 묶음) 반환 (묶음이 다 차지 않았으면 빈 리스트)"""
+    chunk_size = settings.FEEDBACK_FOLD_CHUNK_SIZE
+    folded = int(await redis_client.get(feedback_folded_key(user_email)) or 0)
+    items = await redis_client.lrange(feedbacks_key(user_email), folded, folded + chunk_size - 1)
+    if len(items) < chunk_size:
+        return folded, []
+    return folded, items
+
+
+async def apply_feedback_fold(
+    redis_client: redis.Redis, user_email: str, folded: int, chunk_size: int, partial: str
+) -> bool:
+    """부분 요약 저장 후 접힌 위치 이동 (다른 곳에서 바뀌었으면 False)"""
+    script = redis_client.register_script(_APPLY_FOLD_SCRIPT)
+    applied = await script(
+        keys=[feedbacks_key(user_email), feedback_partials_key(user_email), feedback_folded_key(user_email)],
+        args=[folded, chunk_size, partial],
+    )
+    return bool(applied)
+
+
+async def summarize_feedback_chunk(feedbacks: List[str]) -> str:
+    """피드백 묶음을 부분 요약 하나로 접음"""
+    feedback_text = "\n".join(f"- {feedback}" for feedback in feedbacks)
+    prompt = (
+        f"Feedbacks:\n{feedback_text}\n\n"
+        "Merge these feedbacks into one concise partial summary. "
+        "Keep what the user did well, what the user did wrong and how the user should have said it. "
+        "You must provide answer in Korean. "
+        "Generate the summary in 200 Korean characters."
+    )
+    response = await get_llm_provider("summary").generate(
+        [{"role": "user", "content": prompt}],
+        max_output_tokens=300,
+        temperature=0.3,
+    )
+    return response.text
+
+
+async def load_result_inputs(redis_client: redis.Redis, user_email: str) -> List[str]:
+    """최종 결과에 넣을 입력 (부분 요약 + 아직 접지 않은 최근 피드백)"""
+    async with redis_client.pipeline() as pipe:
+        pipe.lrange(feedback_partials_key(user_email), 0, -1)
+        pipe.get(feedback_folded_key(user_email))
+        pipe.lrange(feedbacks_key(user_email), 0, -1)
+        partials, folded, feedbacks = await pipe.execute()
+    return partials + feedbacks[int(folded or 0):]
+
+
+async def store_turn_feedback(
+    redis_client: redis.Redis, user_email: str, session_id: Optional[str], turn: int, feedback: str
+) -> bool:
+    """
+    미리 생성한 턴 피드백 저장 (feedback_turns:{email} 해시, 필드는 턴 번호)
+
+    생성하는 동안 세션이 정리되거나 새 세션이 시작됐으면 저장하지 않고 False 반환
+    """
+    script = redis_client.register_script(_STORE_TURN_FEEDBACK_SCRIPT)
+    stored = await script(
+        keys=[session_key(user_email), feedback_turns_key(user_email)],
+        args=[session_id or "", turn, feedback, settings.LLM_SPECULATIVE_FEEDBACK_TTL_SECONDS],
+    )
+    return bool(stored)
+
+
+async def pop_turn_feedback(redis_client: redis.Redis, user_email: str, turn: int) -> Optional[str]:
+    """미리 생성한 턴 피드백을 꺼냄 (한 번만 사용되도록 읽으면서 삭제)"""
+    key = feedback_turns_key(user_email)
+    async with redis_client.pipeline() as pipe:
+        pipe.hget(key, str(turn))
+        pipe.hdel(key, str(turn))
+        feedback, _ = await pipe.execute()
+    return feedback
@@ -1,49 +1,296 @@
-from typing import List
+import json
+import uuid
+from typing import List, Optional, Tuple, Union
 
-from langchain.memory import ConversationBufferMemory
-from langchain_community.chat_message_histories import RedisChatMessageHistory
-from langchain.schema import AIMessage, HumanMessage
+import redis as sync_redis
+import redis.asyncio as redis
 
+from app.core.cache import LocalTTLCache
 from app.core.config import settings
+from app.core.metrics import record_cache
+from app.core.keyspace import chat_history_key, chat_history_version_key, memory_summary_key
+from app.core.redis import REDIS_MEMORY, get_sync_redis
+from app.core.serialization import dumps, loads
 
 
-def _get_redis_history(user_email: str) -> RedisChatMessageHistory:
-    return RedisChatMessageHistory(
-        session_id=user_email,
-        url=settings.CELERY_RESULT_BACKEND,
-    )
+# 압축 결과 반영: 요약과 압축한 메시지가 리스트 맨 앞에 그대로 있을 때만 저장
+# (그 뒤에 추가된 턴은 유지, 압축 중 초기화/재작성됐으면 결과를 버림)
+_APPLY_COMPACTION_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '') ~= ARGV[3] then
+    return 0
+end
+local count = #ARGV - 3
+local items = redis.call('LRANGE', KEYS[2], 0, count - 1)
+if #items ~= count then
+    return 0
+end
+for i = 1, count do
+    if items[i] ~= ARGV[i + 3] then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1])
+redis.call('LTRIM', KEYS[2], count, -1)
+redis.call('SET', KEYS[3], ARGV[2])
+return 1
+"""
 
 
-def get_user_memory(user_email: str) -> ConversationBufferMemory:
-    """Redis 기반 LangChain 메모리를 반환"""
-    return ConversationBufferMemory(
-        memory_key="chat_history",
-        chat_memory=_get_redis_history(user_email),
-        return_messages=True,
-    )
+def _new_version() -> str:
+    """대화 기록이 바뀔 때마다 새로 발급하는 버전 토큰"""
+    return uuid.uuid4().hex
 
 
-def reset_user_memory(user_email: str) -> None:
-    """사용자 메모리를 초기화"""
-    history = _get_redis_history(user_email)
-    history.clear()
+def _text(value: Union[str, bytes, None]) -> Optional[str]:
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
 
 
-def build_conversation_history(user_email: str) -> List[dict]:
-    """OpenAI ChatCompletion 포맷으로 변환된 대화 기록 반환"""
-    memory = get_user_memory(user_email)
+def _encode_message(role: str, content: str) -> bytes:
+    """메시지 하나를 [role, content] msgpack으로 인코딩"""
+    return dumps([role, content])
+
+
+def _decode_message(item: bytes) -> dict:
+    # 이전 버전이 저장한 JSON 메시지도 읽음
+    if item[:1] == b"{":
+        return json.loads(item)
+    role, content = loads(item)
+    return {"role": role, "content": content}
+
+
+def _compaction_keys(user_email: str) -> List[str]:
+    return [memory_summary_key(user_email), chat_history_key(user_email), chat_history_version_key(user_email)]
+
+
+def _decode_history(summary: Optional[bytes], items: List[bytes]) -> List[dict]:
+    """저장된 요약과 메시지를 ChatCompletion 포맷 리스트로 변환"""
     history: List[dict] = []
-    for message in memory.chat_memory.messages:
-        if isinstance(message, HumanMessage):
-            history.append({"role": "user", "content": message.content})
-        elif isinstance(message, AIMessage):
-            history.append({"role": "assistant", "content": message.content})
+    if summary:
+        history.append({"role": "system", "content": _text(summary)})
+    history.extend(_decode_message(item) for item in items)
     return history
 
 
-def append_memory(user_email: str, user_message: str, assistant_message: str) -> None:
-    """대화 한 턴을 LangChain 메모리에 추가"""
-    memory = get_user_memory(user_email)
-    memory.chat_memory.add_user_message(user_message)
-    memory.chat_memory.add_ai_message(assistant_message)
+class ConversationStore:
+    """
+    Redis 대화 저장소 (동기, 공용 커넥션 풀 사용)
+
+    메시지는 chat_history:{email} 리스트에 msgpack [role, content]로 오래된 순서로 쌓이고,
+    압축된 이전 대화 요약은 memory_summary:{email}에 저장됩니다.
+    기록이 바뀔 때마다 chat_history_version:{email}에 새 버전 토큰을 기록합니다.
+    한 턴의 읽기/쓰기는 각각 파이프라인 한 번으로 처리합니다.
+    """
+
+    def __init__(self, redis_client: sync_redis.Redis):
+        self._redis = redis_client
+
+    def load(self, user_email: str) -> List[dict]:
+        """요약 + 대화 기록 반환"""
+        with self._redis.pipeline(transaction=False) as pipe:
+            pipe.get(memory_summary_key(user_email))
+            pipe.lrange(chat_history_key(user_email), 0, -1)
+            summary, items = pipe.execute()
+        return _decode_history(summary, items)
+
+    def append_turn(
+        self, user_email: str, user_message: str, assistant_message: str, version: Optional[str] = None
+    ) -> Tuple[int, Optional[str]]:
+        """
+        대화 한 턴 추가 (최대 길이 초과분은 제거)
+
+        Returns:
+            (저장된 메시지 수, 추가 직전 버전 토큰)
+        """
+        key = chat_history_key(user_email)
+        max_messages = settings.MEMORY_MAX_MESSAGES
+        with self._redis.pipeline() as pipe:
+            pipe.rpush(key, _encode_message("user", user_message), _encode_message("assistant", assistant_message))
+            pipe.ltrim(key, -max_messages, -1)
+            pipe.set(chat_history_version_key(user_email), version or _new_version(), get=True)
+            length, _, previous_version = pipe.execute()
+        return min(length, max_messages), _text(previous_version)
+
+    def reset(self, user_email: str) -> None:
+        """대화 기록과 요약 삭제"""
+        with self._redis.pipeline() as pipe:
+            pipe.delete(chat_history_key(user_email), memory_summary_key(user_email))
+            pipe.set(chat_history_version_key(user_email), _new_version())
+            pipe.execute()
+
+    def compaction_candidates(
+        self, user_email: str, keep_messages: int
+    ) -> Tuple[Optional[str], List[dict], List[bytes]]:
+        """(기존 요약, 최근 keep_messages개를 제외한 오래된 메시지, apply_compaction 검증용 원본) 반환"""
+        with self._redis.pipeline(transaction=False) as pipe:
+            pipe.get(memory_summary_key(user_email))
+            pipe.lrange(chat_history_key(user_email), 0, -(keep_messages + 1))
+            summary, items = pipe.execute()
+        return _text(summary), [_decode_message(item) for item in items], items
+
+    def apply_compaction(
+        self, user_email: str, summary: str, previous_summary: Optional[str], compacted_items: List[bytes]
+    ) -> bool:
+        """
+        요약 저장 후 요약된 오래된 메시지 제거 (압축 중 추가된 최신 메시지는 유지)
+
+        압축을 시작한 뒤 기록이 초기화되거나 앞부분이 바뀌었으면 반영하지 않고 False 반환
+        """
+        script = self._redis.register_script(_APPLY_COMPACTION_SCRIPT)
+        applied = script(
+            keys=_compaction_keys(user_email),
+            args=[summary, _new_version(), previous_summary or "", *compacted_items],
+        )
+        return bool(applied)
+
+
+class AsyncConversationStore:
+    """Redis 대화 저장소 (비동기, ConversationStore와 같은 키 구조, bytes 응답 클라이언트 사용)"""
+
+    def __init__(self, redis_client: redis.Redis):
+        self._redis = redis_client
+
+    async def load(self, user_email: str) -> List[dict]:
+        """요약 + 대화 기록 반환"""
+        _, history = await self.load_versioned(user_email)
+        return history
+
+    async def load_versioned(self, user_email: str) -> Tuple[Optional[str], List[dict]]:
+        """(버전 토큰, 요약 + 대화 기록) 반환"""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.get(memory_summary_key(user_email))
+            pipe.lrange(chat_history_key(user_email), 0, -1)
+            pipe.get(chat_history_version_key(user_email))
+            summary, items, version = await pipe.execute()
+        return _text(version), _decode_history(summary, items)
+
+    async def get_version(self, user_email: str) -> Optional[str]:
+        """현재 버전 토큰"""
+        return _text(await self._redis.get(chat_history_version_key(user_email)))
+
+    async def append_turn(
+        self, user_email: str, user_message: str, assistant_message: str, version: Optional[str] = None
+    ) -> Tuple[int, Optional[str]]:
+        """
+        대화 한 턴 추가 (최대 길이 초과분은 제거)
+
+        Returns:
+            (저장된 메시지 수, 추가 직전 버전 토큰)
+        """
+        key = chat_history_key(user_email)
+        max_messages = settings.MEMORY_MAX_MESSAGES
+        async with self._redis.pipeline() as pipe:
+            pipe.rpush(key, _encode_message("user", user_message), _encode_message("assistant", assistant_message))
+            pipe.ltrim(key, -max_messages, -1)
+            pipe.set(chat_history_version_key(user_email), version or _new_version(), get=True)
+            length, _, previous_version = await pipe.execute()
+        return min(length, max_messages), _text(previous_version)
+
+    async def reset(self, user_email: str) -> None:
+        """대화 기록과 요약 삭제"""
+        async with self._redis.pipeline() as pipe:
+            pipe.delete(chat_history_key(user_email), memory_summary_key(user_email))
+            pipe.set(chat_history_version_key(user_email), _new_version())
+            await pipe.execute()
+
+    async def compaction_candidates(
+        self, user_email: str, keep_messages: int
+    ) -> Tuple[Optional[str], List[dict], List[bytes]]:
+        """(기존 요약, 최근 keep_messages개를 제외한 오래된 메시지, apply_compaction 검증용 원본) 반환"""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.get(memory_summary_key(user_email))
+            pipe.lrange(chat_history_key(user_email), 0, -(keep_messages + 1))
+            summary, items = await pipe.execute()
+        return _text(summary), [_decode_message(item) for item in items], items
+
+    async def apply_compaction(
+        self, user_email: str, summary: str, previous_summary: Optional[str], compacted_items: List[bytes]
+    ) -> bool:
+        """
+        요약 저장 후 요약된 오래된 메시지 제거 (압축 중 추가된 최신 메시지는 유지)
+
+        압축을 시작한 뒤 기록이 초기화되거나 앞부분이 바뀌었으면 반영하지 않고 False 반환
+        """
+        script = self._redis.register_script(_APPLY_COMPACTION_SCRIPT)
+        applied = await script(
+            keys=_compaction_keys(user_email),
+            args=[summary, _new_version(), previous_summary or "", *compacted_items],
+        )
+        return bool(applied)
+
+
+class WarmConversationCache:
+    """
+    워커 프로세스 로컬 대화 기록 캐시
+
+    같은 사용자의 턴은 같은 샤드 워커로 오므로, 워커가 대화 기록을 로컬에 들고 있다가
+    버전 토큰만 확인해 그대로 재사용합니다. 다른 곳에서 기록이 바뀌면(압축, 초기화 등)
+    버전이 달라져 다시 읽습니다.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._cache = LocalTTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    async def load(self, store: AsyncConversationStore, user_email: str) -> List[dict]:
+        """대화 기록 반환 (버전이 같으면 로컬 사본 사용)"""
+        cached = self._cache.get(user_email)
+        if cached is not None:
+            version = await store.get_version(user_email)
+            if version is not None and version == cached[0]:
+                record_cache("warm_history", True)
+                return list(cached[1])
+
+        record_cache("warm_history", False)
+        version, history = await store.load_versioned(user_email)
+        self._cache.set(user_email, (version, history))
+        return list(history)
+
+    async def append_turn(
+        self, store: AsyncConversationStore, user_email: str, user_message: str, assistant_message: str
+    ) -> int:
+        """대화 한 턴 추가 후 로컬 사본도 갱신 (저장된 메시지 수 반환)"""
+        version = _new_version()
+        message_count, previous_version = await store.append_turn(
+            user_email, user_message, assistant_message, version=version
+        )
+
+        cached = self._cache.get(user_email)
+        if (
+            cached is not None
+            and cached[0] == previous_version
+            and message_count < settings.MEMORY_MAX_MESSAGES
+        ):
+            history = cached[1] + [
+                {"role": "user", "content": user_message},
+                {"role": "assistant", "content": assistant_message},
+            ]
+            self._cache.set(user_email, (version, history))
+        else:
+            self._cache.delete(user_email)
+        return message_count
+
+
+def reset_user_memory(user_email: str) -> None:
+    """사용자 메모리를 초기화 (요약 포함)"""
+    ConversationStore(get_sync_redis(REDIS_MEMORY)).reset(user_email)
+
+
+def build_conversation_history(user_email: str) -> List[dict]:
+    """
+    OpenAI ChatCompletion 포맷으로 변환된 대화 기록 반환
+
+    압축된 이전 대화 요약이 있으면 system 메시지로 맨 앞에 붙입니다.
+    """
+    return ConversationStore(get_sync_redis(REDIS_MEMORY)).load(user_email)
+
+
+def append_memory(user_email: str, user_message: str, assistant_message: str) -> int:
+    """대화 한 턴을 메모리에 추가 (저장된 메시지 수 반환)"""
+    message_count, _ = ConversationStore(get_sync_redis(REDIS_MEMORY)).append_turn(user_email, user_message, assistant_message)
+    return message_count
+
 
+def needs_compaction(message_count: int) -> bool:
+    """저장된 메시지 수가 압축 기준을 넘었는지 확인"""
+    return message_count > settings.MEMORY_COMPACTION_THRESHOLD_TURNS * 2
@@ -0,0 +1,347 @@
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.core.metrics import record_llm_call, record_llm_tokens
+from app.core.tracing import leaf_span
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LLMResponse:
+    """LLM 호출 결과 (공급자와 무관한 공통 형태)"""
+    text: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class LLMProvider(ABC):
+    """
+    LLM 공급자 인터페이스
+
+    messages는 OpenAI ChatCompletion 포맷({"role", "content"})을 사용합니다.
+    구현체는 프로세스 수명 동안 재사용되므로 클라이언트를 생성자에서 한 번만 만듭니다.
+    sdk_retries가 False이면 SDK 자체 재시도와 제한 시간을 끄고 ResilientProvider에 맡깁니다.
+    """
+
+    # 다시 시도해도 되는 일시적 오류 (연결 실패, 요청 한도, 서버 오류 등)
+    retryable_errors: Tuple[type, ...] = ()
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    @abstractmethod
+    async def generate(
+        self,
+        messages: List[dict],
+        max_output_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> LLMResponse:
+        ...
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini 공급자"""
+
+    def __init__(self, model_name: str, api_key: str, sdk_retries: bool = True):
+        super().__init__(model_name)
+        # 실제 공급자를 쓸 때만 SDK를 불러옴 (스텁은 오프라인 실행 가능)
+        import google.generativeai as genai
+        from google.api_core import exceptions as google_exceptions
+
+        genai.configure(api_key=api_key)
+        self.retryable_errors = (
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.InternalServerError,
+            google_exceptions.ResourceExhausted,
+            google_exceptions.ServiceUnavailable,
+        )
+        self._genai = genai
+        self._model = genai.GenerativeModel(model_name)
+        # SDK 기본값은 ServiceUnavailable을 최대 600초까지 재시도
+        self._request_options = {} if sdk_retries else {"retry": None, "timeout": None}
+
+    async def generate(
+        self,
+        messages: List[dict],
+        max_output_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> LLMResponse:
+        # Gemini에는 메시지를 하나의 프롬프트로 합쳐서 전달
+        prompt = "\n\n".join(message["content"] for message in messages)
+        response = await self._model.generate_content_async(
+            prompt,
+            generation_config=self._genai.types.GenerationConfig(
+                max_output_tokens=max_output_tokens,
+                temperature=temperature,
+            ),
+            request_options=self._request_options,
+        )
+        usage = getattr(response, "usage_metadata", None)
+        return LLMResponse(
+            text=response.text.strip(),
+            model=self.model_name,
+            prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+            completion_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+        )
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI 공급자 (커넥션 풀을 가진 비동기 클라이언트 재사용)"""
+
+    def __init__(self, model_name: str, api_key: str, max_connections: int, sdk_retries: bool = True):
+        super().__init__(model_name)
+        import httpx
+        import openai
+
+        self.retryable_errors = (
+            openai.APIConnectionError,
+            openai.InternalServerError,
+            openai.RateLimitError,
+        )
+        # SDK 기본값은 2회 재시도, 600초 제한 시간
+        sdk_options = {} if sdk_retries else {"max_retries": 0, "timeout": None}
+        self._client = openai.AsyncOpenAI(
+            api_key=api_key,
+            **sdk_options,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            ),
+        )
+
+    async def generate(
+        self,
+        messages: List[dict],
+        max_output_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> LLMResponse:
+        options = {}
+        if max_output_tokens is not None:
+            options["max_tokens"] = max_output_tokens
+        if temperature is not None:
+            options["temperature"] = temperature
+
+        response = await self._client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            **options,
+        )
+        usage = response.usage
+        return LLMResponse(
+            text=response.choices[0].message.content.strip(),
+            model=self.model_name,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+
+class StubProvider(LLMProvider):
+    """
+    로컬 스텁 공급자
+
+    네트워크 없이 프롬프트 해시로 결정적인 응답을 만들고, 설정한 지연만큼 기다립니다.
+    부하 테스트나 오프라인 테스트에서 실제 모델 대신 사용합니다.
+    """
+
+    def __init__(self, model_name: str, latency_ms: int):
+        super().__init__(model_name)
+        self._latency = latency_ms / 1000
+
+    async def generate(
+        self,
+        messages: List[dict],
+        max_output_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> LLMResponse:
+        prompt = "\n\n".join(message["content"] for message in messages)
+        if self._latency > 0:
+            await asyncio.sleep(self._latency)
+
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        text = f"스텁 응답 {digest}"
+        return LLMResponse(
+            text=text,
+            model=self.model_name,
+            prompt_tokens=len(prompt.split()),
+            completion_tokens=len(text.split()),
+        )
+
+
+class ResilientProvider(LLMProvider):
+    """
+    공급자 호출 보호 래퍼
+
+    - 호출마다 제한 시간(LLM_CALL_TIMEOUT_SECONDS) 적용
+    - 일시적 오류는 지수 백오프 + 지터로 재시도
+    - 실패가 쌓이면 서킷을 열어 바로 실패 (워커 간 Redis로 공유)
+    - LLM_HEDGE_ENABLED이면 최근 지연 백분위수가 지나도 응답이 없을 때 같은 요청을 한 번 더 보냄
+    - 시도별 지연과 토큰 사용량을 지표로 기록
+    """
+
+    def __init__(self, provider: LLMProvider, name: str):
+        super().__init__(provider.model_name)
+        self._provider = provider
+        self._breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            failure_window_seconds=settings.LLM_BREAKER_FAILURE_WINDOW_SECONDS,
+            open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+            probe_timeout_seconds=settings.LLM_CALL_TIMEOUT_SECONDS,
+        )
+        # 최근 성공 호출 지연 (초, 헤지 기준 계산용)
+        self._latencies: Deque[float] = deque(maxlen=settings.LLM_HEDGE_LATENCY_WINDOW)
+
+    async def generate(
+        self,
+        messages: List[dict],
+        max_output_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> LLMResponse:
+        async def call() -> LLMResponse:
+            return await self._timed_call(messages, max_output_tokens, temperature)
+
+        attempts = max(1, settings.LLM_RETRY_MAX_ATTEMPTS)
+        for attempt in range(attempts):
+            probe = await self._breaker.before_call()
+            try:
+                if settings.LLM_HEDGE_ENABLED:
+                    response = await self._hedged(call)
+                else:
+                    response = await call()
+            except (asyncio.TimeoutError, *self._provider.retryable_errors) as e:
+                await self._breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(
+                    f"LLM call to {self._breaker.name} failed ({type(e).__name__}), "
+                    f"retrying in {delay:.2f}s ({attempt + 1}/{attempts})"
+                )
+                await asyncio.sleep(delay)
+                continue
+            await self._breaker.record_success(probe)
+            return response
+
+    async def _timed_call(
+        self,
+        messages: List[dict],
+        max_output_tokens: Optional[int],
+        temperature: Optional[float],
+    ) -> LLMResponse:
+        started = time.monotonic()
+        try:
+            with leaf_span(f"llm {self._breaker.name}") as span:
+                response = await asyncio.wait_for(
+                    self._provider.generate(messages, max_output_tokens=max_output_tokens, temperature=temperature),
+                    timeout=settings.LLM_CALL_TIMEOUT_SECONDS,
+                )
+                if span is not None:
+                    span.set_attribute("prompt_tokens", response.prompt_tokens)
+                    span.set_attribute("completion_tokens", response.completion_tokens)
+        except asyncio.TimeoutError:
+            record_llm_call(self._breaker.name, "timeout", time.monotonic() - started)
+            raise
+        except Exception:
+            record_llm_call(self._breaker.name, "error", time.monotonic() - started)
+            raise
+        elapsed = time.monotonic() - started
+        self._latencies.append(elapsed)
+        record_llm_call(self._breaker.name, "success", elapsed)
+        record_llm_tokens(self._breaker.name, response.prompt_tokens, response.completion_tokens)
+        return response
+
+    async def _hedged(self, call: Callable[[], Awaitable[LLMResponse]]) -> LLMResponse:
+        """헤지 지연 안에 끝나지 않으면 두 번째 요청을 보내고 먼저 성공한 응답 사용"""
+        first = asyncio.ensure_future(call())
+        done, _ = await asyncio.wait({first}, timeout=self._hedge_delay())
+        if done:
+            return first.result()
+
+        pending = {first, asyncio.ensure_future(call())}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _hedge_delay(self) -> float:
+        """최근 지연의 LLM_HEDGE_PERCENTILE 백분위수 (표본이 적으면 기본값)"""
+        if len(self._latencies) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+        latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * settings.LLM_HEDGE_PERCENTILE / 100))
+        return latencies[index]
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """지수 백오프 + 전체 지터"""
+        ceiling = min(
+            settings.LLM_RETRY_MAX_DELAY_SECONDS,
+            settings.LLM_RETRY_BASE_DELAY_SECONDS * (2 ** attempt),
+        )
+        return random.uniform(0, ceiling)
+
+
+def _provider_config(role: str) -> Tuple[str, str]:
+    """역할(chat/feedback/result/summary)별 공급자 이름과 모델"""
+    if role == "chat":
+        return settings.LLM_CHAT_PROVIDER, settings.LLM_CHAT_MODEL
+    if role == "feedback":
+        return settings.LLM_FEEDBACK_PROVIDER, settings.LLM_FEEDBACK_MODEL
+    if role == "result":
+        return settings.LLM_RESULT_PROVIDER, settings.LLM_RESULT_MODEL
+    if role == "summary":
+        return settings.LLM_SUMMARY_PROVIDER, settings.LLM_SUMMARY_MODEL
+    raise ValueError(f"Unknown LLM role: {role}")
+
+
+def _create_provider(provider_name: str, model_name: str) -> LLMProvider:
+    # ResilientProvider로 감싸면 재시도/제한 시간은 래퍼만 담당 (SDK 재시도와 겹치지 않도록)
+    sdk_retries = not settings.LLM_RESILIENCE_ENABLED
+    if provider_name == "gemini":
+        return GeminiProvider(model_name, api_key=settings.LLM_API_KEY, sdk_retries=sdk_retries)
+    if provider_name == "openai":
+        return OpenAIProvider(
+            model_name,
+            api_key=settings.OPENAI_API_KEY,
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            sdk_retries=sdk_retries,
+        )
+    if provider_name == "stub":
+        return StubProvider(model_name, latency_ms=settings.LLM_STUB_LATENCY_MS)
+    raise ValueError(f"Unknown LLM provider: {provider_name}")
+
+
+# 프로세스 전역 공급자 캐시 (공급자/모델 조합당 하나)
+_providers: Dict[Tuple[str, str], LLMProvider] = {}
+
+def get_llm_provider(role: str) -> LLMProvider:
+    """역할에 맞는 LLM 공급자를 반환 (싱글톤 패턴)"""
+    key = _provider_config(role)
+    provider = _providers.get(key)
+    if provider is None:
+        provider = _create_provider(*key)
+        if settings.LLM_RESILIENCE_ENABLED:
+            provider = ResilientProvider(provider, name=f"llm:{key[0]}:{key[1]}")
+        _providers[key] = provider
+    return provider
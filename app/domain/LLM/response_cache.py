@@ -0,0 +1,123 @@
+import hashlib
+import json
+import time
+from typing import Dict, List, Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+CACHE_KEY_PREFIX = "llm_cache:"
+# 마지막 접근 시각을 점수로 가진 LRU 인덱스
+CACHE_INDEX_KEY = "llm_cache_index"
+# hits / misses 카운터
+CACHE_STATS_KEY = "llm_cache_stats"
+
+# 조회: 적중 시 LRU 점수 갱신, 적중/미스 카운터 증가를 한 번에 처리
+_GET_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if value then
+    redis.call('ZADD', KEYS[2], 'XX', ARGV[1], KEYS[1])
+    redis.call('HINCRBY', KEYS[3], 'hits', 1)
+else
+    redis.call('HINCRBY', KEYS[3], 'misses', 1)
+end
+return value
+"""
+
+# 저장: TTL로 저장 후 만료된 인덱스 정리, 최대 개수를 넘으면 오래 안 쓴 항목부터 제거
+_SET_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[3], KEYS[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', tonumber(ARGV[3]) - tonumber(ARGV[2]))
+local overflow = redis.call('ZCARD', KEYS[2]) - tonumber(ARGV[4])
+if overflow > 0 then
+    local victims = redis.call('ZRANGE', KEYS[2], 0, overflow - 1)
+    redis.call('DEL', unpack(victims))
+    redis.call('ZREM', KEYS[2], unpack(victims))
+end
+return overflow
+"""
+
+
+def _text(value) -> Optional[str]:
+    """결과용 Redis는 bytes로 응답하므로 문자열로 변환"""
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def make_response_cache_key(
+    model: str,
+    character_id: int,
+    episode_id: int,
+    conversation_history: List[dict],
+    user_message: str,
+) -> str:
+    """캐릭터/에피소드/정규화된 대화 기록/사용자 메시지로 캐시 키 생성"""
+    payload = json.dumps(
+        {
+            "model": model,
+            "character_id": character_id,
+            "episode_id": episode_id,
+            "history": [
+                [message["role"], _normalize(message["content"])]
+                for message in conversation_history
+            ],
+            "user_message": _normalize(user_message),
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return CACHE_KEY_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    캐릭터 응답 완전 일치 캐시 (Redis)
+
+    같은 캐릭터/에피소드/대화 기록/메시지 조합이면 모델 호출 없이 이전 응답을 돌려줍니다.
+    항목은 TTL로 만료되고, 전체 개수는 LRU 인덱스로 제한됩니다.
+    """
+
+    def __init__(self, redis_client: redis.Redis):
+        self._redis = redis_client
+        self._get_script = redis_client.register_script(_GET_SCRIPT)
+        self._set_script = redis_client.register_script(_SET_SCRIPT)
+
+    async def get(self, key: str) -> Optional[str]:
+        """캐시 조회 (적중/미스 카운터 갱신 포함)"""
+        value = await self._get_script(
+            keys=[key, CACHE_INDEX_KEY, CACHE_STATS_KEY],
+            args=[time.time()],
+        )
+        return _text(value)
+
+    async def set(self, key: str, value: str) -> None:
+        """캐시 저장"""
+        await self._set_script(
+            keys=[key, CACHE_INDEX_KEY],
+            args=[
+                value,
+                settings.LLM_RESPONSE_CACHE_TTL_SECONDS,
+                time.time(),
+                settings.LLM_RESPONSE_CACHE_MAX_ENTRIES,
+            ],
+        )
+
+    async def stats(self) -> Dict[str, int]:
+        """적중/미스 카운터와 현재 항목 수"""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(CACHE_STATS_KEY)
+            pipe.zcard(CACHE_INDEX_KEY)
+            counters, size = await pipe.execute()
+        counters = {_text(name): int(value) for name, value in counters.items()}
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "size": size,
+        }
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, status, HTTPException
-from fastapi.concurrency import run_in_threadpool
+from fastapi import APIRouter, Depends, status, HTTPException, WebSocket, WebSocketDisconnect, Query, Header, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.domain.LLM.schemas import (
     GetLLMMessageRequest, 
@@ -8,22 +8,74 @@ from app.domain.LLM.schemas import (
     GetLLMResultResponse,
     TaskStatusResponse
 )
-from app.domain.LLM.task import get_llm_message, get_gpt_feedback, get_gpt_result
+from app.domain.LLM.task import (
+    finalize_idempotency_scope,
+    finalize_session,
+    fold_feedback,
+    get_gpt_feedback,
+    get_llm_message,
+)
+from app.domain.LLM.session import SessionStore
+from app.domain.LLM.feedback import claim_feedback_fold, deliver_feedback, pop_turn_feedback
 from app.core.dependencies import get_db, get_redis_client
-from app.core.security import get_current_user_id
-from app.domain.user.repository import UserRepository, ChatRoomRepository
+from app.core.security import get_current_user_id, get_user_id_from_token
+from app.core.pubsub import get_pubsub_hub
+from app.core.task_waiter import get_task_meta, wait_for_task_result, watch_task, TaskFailedError
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.keyspace import room_id_key
+from app.core.rate_limit import RATE_LIMIT_FEEDBACK, RATE_LIMIT_MESSAGE, RATE_LIMIT_RESULT, rate_limit
+from app.core.idempotency import (
+    MAX_IDEMPOTENCY_KEY_LENGTH,
+    claim_idempotency_key,
+    release_idempotency_key,
+)
+from app.domain.user.repository import UserRepository
+from celery import states
 from celery.result import AsyncResult
+from contextlib import aclosing
+from typing import Optional
 import redis.asyncio as redis
+import asyncio
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/message", response_model=GetLLMMessageResponse, status_code=status.HTTP_202_ACCEPTED)
+# 소켓당 대기 가능한 최대 메시지 수 (느린 클라이언트 보호)
+WEBSOCKET_QUEUE_SIZE = 100
+# WebSocket 인증 (Sec-WebSocket-Protocol 값, 첫 인증 메시지 대기 시간)
+WEBSOCKET_AUTH_SUBPROTOCOL = "bearer"
+WEBSOCKET_AUTH_TIMEOUT_SECONDS = 10
+
+@router.post(
+    "/message",
+    response_model=GetLLMMessageResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(rate_limit(RATE_LIMIT_MESSAGE))]
+)
 async def request_llm_message(
     request: GetLLMMessageRequest,
     user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db),
-    redis_client: redis.Redis = Depends(get_redis_client)
+    redis_client: redis.Redis = Depends(get_redis_client),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
+    """
+    캐릭터 응답 생성 요청 API
+
+    Idempotency-Key 헤더를 보내면 같은 키로 재시도한 요청은 새 태스크를 만들지 않고
+    처음 요청의 task_id를 그대로 반환합니다.
+    """
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid Idempotency-Key"
+        )
+
     # User 조회하여 email 가져오기
     user = UserRepository.get_by_id(db, user_id)
     if not user:
@@ -32,43 +84,72 @@ async def request_llm_message(
             detail="User not found"
         )
     user_email = user.email
+
+    # 1. 멱등성 키 선점 (중복 요청이면 처음 발급한 task_id 반환)
+    task_id = str(uuid.uuid4())
+    idempotency_scope = f"llm_message:{user_id}"
+    if idempotency_key:
+        existing_task_id = await claim_idempotency_key(
+            redis_client,
+            idempotency_scope,
+            idempotency_key,
+            task_id,
+            settings.IDEMPOTENCY_TTL_SECONDS,
+        )
+        if existing_task_id:
+            return {"task_id": existing_task_id}
     
-    # episode_id 저장
-    episode_key = f"episode_id:{user_email}"
-    if await redis_client.exists(episode_key):
-        await redis_client.delete(episode_key)
-    await redis_client.set(episode_key, request.episode_id)
-    
-    # count 증가 (INCR은 키가 없을 경우 0으로 초기화 후 1 증가)
-    count_key = f"count:{user_email}"
-    await redis_client.incr(count_key)
-        
-    # character_id 저장
-    char_key = f"character_id:{user_email}"
-    await redis_client.set(char_key, request.character_id)
-
-    # 2. Celery Task 실행
-    task = get_llm_message.delay(
-        character_id=request.character_id, 
-        episode_id=request.episode_id, 
-        user_email=user_email,
-        user_id=user_id,
-        user_message=request.user_message
-    )
+    # 세션 갱신/태스크 발행이 실패하면 선점한 키를 풀어 재시도가 새로 처리되도록 하고,
+    # 발급한 턴은 완료로 기록해 다음 턴이 이 턴을 기다리지 않도록 함
+    sessions = SessionStore(redis_client)
+    turn = None
+    try:
+        # 세션 갱신 (에피소드/캐릭터 저장, 턴 수 증가, 에피소드 변경 확인을 한 번에)
+        turn, episode_changed = await sessions.start_turn(
+            user_email, request.episode_id, request.character_id
+        )
+
+        # 2. Celery Task 실행 (선점한 task_id 사용)
+        task = get_llm_message.apply_async(
+            kwargs={
+                "character_id": request.character_id,
+                "episode_id": request.episode_id,
+                "user_email": user_email,
+                "user_id": user_id,
+                "user_message": request.user_message,
+                "reset_memory": episode_changed,
+                "turn": turn,
+            },
+            task_id=task_id,
+        )
+    except Exception:
+        if turn is not None:
+            await sessions.finish_turn(user_email, turn)
+        if idempotency_key:
+            await release_idempotency_key(redis_client, idempotency_scope, idempotency_key)
+        raise
     
     return {"task_id": task.id}
 
 
-@router.get("/feedbacks", response_model=GetLLMFeedbackResponse, status_code=status.HTTP_202_ACCEPTED)
+@router.get(
+    "/feedbacks",
+    response_model=GetLLMFeedbackResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(rate_limit(RATE_LIMIT_FEEDBACK))]
+)
 async def request_gpt_feedback(
+    response: Response,
     user_id: int = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_redis_client)
 ):
     """
     GPT의 피드백을 생성하는 API
     
     현재 대화 내역을 분석하여 사용자의 응답에 대한 비판적 피드백을 생성합니다.
     Celery 태스크를 비동기로 실행하고 task_id를 반환합니다.
+    턴마다 미리 생성한 피드백이 있으면(LLM_SPECULATIVE_FEEDBACK_ENABLED) 태스크 없이 바로 반환합니다.
     """
     # User 조회하여 email 가져오기
     user = UserRepository.get_by_id(db, user_id)
@@ -79,22 +160,44 @@ async def request_gpt_feedback(
         )
     user_email = user.email
     
+    # 현재 턴에 대해 미리 생성된 피드백이 있으면 바로 사용
+    if settings.LLM_SPECULATIVE_FEEDBACK_ENABLED:
+        session = await SessionStore(redis_client).get(user_email)
+        feedback = await pop_turn_feedback(redis_client, user_email, session.count)
+        if feedback:
+            feedback_count = await deliver_feedback(redis_client, user_email, user_id, feedback)
+            if await claim_feedback_fold(redis_client, user_email, feedback_count):
+                fold_feedback.delay(user_email)
+            response.status_code = status.HTTP_200_OK
+            return {"task_id": None, "feedback": feedback}
+    
     # Celery Task 실행
     task = get_gpt_feedback.delay(user_email)
     
     return {"task_id": task.id}
 
 
-@router.get("/results", response_model=GetLLMResultResponse, status_code=status.HTTP_200_OK)
+@router.get(
+    "/results",
+    response_model=GetLLMResultResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(rate_limit(RATE_LIMIT_RESULT))]
+)
 async def request_gpt_result(
+    response: Response,
+    wait: bool = Query(False),
     user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db),
     redis_client: redis.Redis = Depends(get_redis_client)
 ):
     """
-    대화 종료 시 피드백을 출력하고 저장하는 API
-    
-    Redis에서 room_id를 가져오고, GPT 결과를 생성하여 데이터베이스에 저장한 후 반환합니다.
+    대화 종료 API
+
+    결과 생성, 데이터베이스 저장, Redis 정리를 백그라운드 태스크(finalize_session)로 실행하고
+    task_id를 바로 반환합니다. 완료된 결과는 WebSocket(gpt_result_message)으로 전달됩니다.
+    같은 채팅방에 대해 다시 요청하면 새 태스크를 만들지 않고 처음 task_id를 반환합니다.
+    (처음 태스크가 실패했으면 새 태스크로 다시 시도, 실패는 WebSocket gpt_result_error로 알림)
+    wait=true이면 기존처럼 결과가 나올 때까지 기다렸다가 함께 반환합니다.
     """
     # User 조회하여 email 가져오기
     user = UserRepository.get_by_id(db, user_id)
@@ -106,8 +209,7 @@ async def request_gpt_result(
     user_email = user.email
     
     # Redis에서 room_id 가져오기
-    room_id_key = f"room_id:{user_email}"
-    room_id = await redis_client.get(room_id_key)
+    room_id = await redis_client.get(room_id_key(user_email))
     
     if room_id is None:
         raise HTTPException(
@@ -124,50 +226,103 @@ async def request_gpt_result(
             detail="Invalid room_id in Redis"
         )
     
-    # GPT 결과 요청 (Celery 태스크를 비동기로 실행)
-    task = get_gpt_result.apply_async(args=[user_email])
-    result_text = await run_in_threadpool(task.get)
-    
-    # 데이터베이스에 피드백 저장 (소유자 검증 포함)
-    chat_room_updated = ChatRoomRepository.update_result(db, room_id, user_id, result_text)
-    if not chat_room_updated:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Chat room not found"
-        )
+    # 채팅방당 종료 태스크는 하나만 (중복 요청이면 처음 task_id 사용)
+    task_id = str(uuid.uuid4())
+    idempotency_scope = finalize_idempotency_scope(user_id)
+    existing_task_id = await claim_idempotency_key(
+        redis_client,
+        idempotency_scope,
+        str(room_id),
+        task_id,
+        settings.IDEMPOTENCY_TTL_SECONDS,
+    )
+    # 처음 태스크가 실패로 끝났으면(워커 유실 등으로 태스크가 키를 풀지 못한 경우) 새로 시도
+    if existing_task_id:
+        meta = await get_task_meta(existing_task_id)
+        if meta is not None and meta["status"] in states.PROPAGATE_STATES:
+            await release_idempotency_key(redis_client, idempotency_scope, str(room_id), existing_task_id)
+            existing_task_id = await claim_idempotency_key(
+                redis_client,
+                idempotency_scope,
+                str(room_id),
+                task_id,
+                settings.IDEMPOTENCY_TTL_SECONDS,
+            )
+    if existing_task_id:
+        task_id = existing_task_id
+    else:
+        try:
+            finalize_session.apply_async(args=[user_email, user_id, room_id], task_id=task_id)
+        except Exception:
+            await release_idempotency_key(redis_client, idempotency_scope, str(room_id))
+            raise
     
-    # Redis에서 사용자 관련 키 명시적으로 삭제 (성능 최적화)
-    keys_to_delete = [
-        f"room_id:{user_email}",
-        f"episode_id:{user_email}",
-        f"count:{user_email}",
-        f"character_id:{user_email}",
-        f"feedbacks:{user_email}",
-        f"talk_content:{user_email}",
-        f"memory_episode:{user_email}",
-    ]
-    # 존재하는 키만 삭제
-    for key in keys_to_delete:
-        if await redis_client.exists(key):
-            await redis_client.delete(key)
+    result_text = None
+    if wait:
+        try:
+            task_result = await wait_for_task_result(task_id, timeout=settings.TASK_RESULT_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Result generation timed out"
+            )
+        except TaskFailedError as e:
+            logger.error(f"finalize_session failed for {user_email}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Result generation failed"
+            )
+        result_text = task_result["result"]
+        response.status_code = status.HTTP_200_OK
     
     return {
+        "task_id": task_id,
         "result": result_text,
         "name": user.name,
         "room_id": room_id
     }
 
 
+def _task_status_from_meta(task_id: str, meta: dict) -> dict:
+    """결과 백엔드 태스크 메타를 상태 조회 응답 형태로 변환"""
+    status = meta["status"]
+    result = None
+    if status == states.SUCCESS:
+        result = meta["result"]
+    elif status in states.EXCEPTION_STATES:
+        result = str(celery_app.backend.exception_to_python(meta["result"]))
+    return {"task_id": task_id, "status": status, "result": result}
+
+
 @router.get("/task/{task_id}", response_model=TaskStatusResponse, status_code=status.HTTP_200_OK)
 async def get_task_status(
     task_id: str,
+    wait: Optional[float] = Query(None, gt=0),
+    since: str = Query(states.PENDING),
     user_id: int = Depends(get_current_user_id)
 ):
     """
     Celery task 상태 및 결과 조회
     
     task_id로 작업 상태(PENDING/SUCCESS/FAILURE)와 결과를 확인합니다.
+    wait(초)를 주면 long-poll로 동작해 상태가 since와 달라지는 즉시(또는 wait가 지나면) 응답합니다.
+    대기는 결과 백엔드 알림으로 처리하므로 결과 백엔드를 반복 조회하지 않습니다.
     """
+    if wait is not None:
+        timeout = min(wait, settings.TASK_RESULT_TIMEOUT_SECONDS)
+        meta = {"status": states.PENDING, "result": None}
+        try:
+            async with aclosing(watch_task(task_id, timeout)) as updates:
+                async for update in updates:
+                    if update is None:
+                        continue
+                    meta = update
+                    if meta["status"] != since:
+                        break
+        except asyncio.TimeoutError:
+            pass
+        return _task_status_from_meta(task_id, meta)
+
     task_result = AsyncResult(task_id)
     
     response = {
@@ -184,3 +339,116 @@ async def get_task_status(
     
     return response
 
+
+@router.get("/task/{task_id}/events")
+async def stream_task_status(
+    task_id: str,
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Celery task 상태 SSE 스트림
+
+    상태가 바뀔 때마다 status 이벤트(data는 상태 조회 응답과 같은 JSON)를 보내고
+    완료 상태를 보낸 뒤 스트림을 닫습니다. 변화가 없는 동안에는 주석 줄로 연결을 유지합니다.
+    """
+    async def event_stream():
+        try:
+            async with aclosing(watch_task(task_id, settings.TASK_RESULT_TIMEOUT_SECONDS)) as updates:
+                async for meta in updates:
+                    if meta is None:
+                        yield ": keep-alive\n\n"
+                        continue
+                    payload = json.dumps(_task_status_from_meta(task_id, meta), ensure_ascii=False)
+                    yield f"event: status\ndata: {payload}\n\n"
+        except asyncio.TimeoutError:
+            yield "event: timeout\ndata: {}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _authenticate_websocket(websocket: WebSocket) -> Optional[int]:
+    """
+    WebSocket 연결 인증 (성공하면 연결을 수락하고 사용자 ID 반환, 실패하면 연결을 닫고 None)
+
+    토큰이 URL(접근 로그)에 남지 않도록 쿼리 파라미터 대신 아래 두 방식 중 하나로 받습니다.
+        1. Sec-WebSocket-Protocol 헤더: new WebSocket(url, ["bearer", token])
+        2. 연결 직후 첫 메시지: {"type": "auth", "token": "..."}
+    """
+    protocols = [p.strip() for p in websocket.headers.get("sec-websocket-protocol", "").split(",") if p.strip()]
+    if len(protocols) == 2 and protocols[0] == WEBSOCKET_AUTH_SUBPROTOCOL:
+        try:
+            user_id = get_user_id_from_token(protocols[1])
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return None
+        await websocket.accept(subprotocol=WEBSOCKET_AUTH_SUBPROTOCOL)
+        return user_id
+
+    await websocket.accept()
+    try:
+        message = json.loads(await asyncio.wait_for(websocket.receive_text(), WEBSOCKET_AUTH_TIMEOUT_SECONDS))
+        if not isinstance(message, dict) or message.get("type") != "auth":
+            raise ValueError("auth message expected")
+        return get_user_id_from_token(str(message.get("token", "")))
+    except WebSocketDisconnect:
+        return None
+    except (asyncio.TimeoutError, ValueError, HTTPException):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return None
+
+
+@router.websocket("/ws")
+async def chat_websocket(websocket: WebSocket):
+    """
+    채팅 메시지 WebSocket
+
+    Celery 태스크가 chat_{user_id} 채널로 발행한 메시지를 클라이언트로 전달합니다.
+    프로세스 공유 pub/sub 허브를 사용하므로 소켓마다 Redis 구독을 만들지 않습니다.
+    인증 방식은 _authenticate_websocket 참고.
+    """
+    user_id = await _authenticate_websocket(websocket)
+    if user_id is None:
+        return
+
+    channel_name = f"chat_{user_id}"
+    queue: asyncio.Queue = asyncio.Queue(maxsize=WEBSOCKET_QUEUE_SIZE)
+
+    def on_message(data: str) -> None:
+        try:
+            queue.put_nowait(data)
+        except asyncio.QueueFull:
+            logger.warning(f"WebSocket queue full, dropping message for user {user_id}")
+
+    async def forward_messages():
+        while True:
+            data = await queue.get()
+            await websocket.send_text(data)
+
+    async def wait_disconnect():
+        # 클라이언트 메시지는 무시하고 연결 종료만 감지
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    hub = get_pubsub_hub()
+    await hub.subscribe(channel_name, on_message)
+    tasks = [
+        asyncio.create_task(forward_messages()),
+        asyncio.create_task(wait_disconnect()),
+    ]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() and not isinstance(task.exception(), WebSocketDisconnect):
+                logger.error(f"WebSocket error for user {user_id}: {task.exception()}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await hub.unsubscribe(channel_name, on_message)
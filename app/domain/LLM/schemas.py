@@ -1,3 +1,4 @@
+from typing import Any, Optional
 from pydantic import BaseModel
 
 class GetLLMMessageRequest(BaseModel):
@@ -9,14 +10,16 @@ class GetLLMMessageResponse(BaseModel):
     task_id: str
 
 class GetLLMFeedbackResponse(BaseModel):
-    task_id: str
+    task_id: Optional[str] = None
+    feedback: Optional[str] = None
 
 class GetLLMResultResponse(BaseModel):
-    result: str
+    task_id: str
     name: str
     room_id: int
+    result: Optional[str] = None
 
 class TaskStatusResponse(BaseModel):
     task_id: str
     status: str
-    result: str = None
\ No newline at end of file
+    result: Any = None
\ No newline at end of file
@@ -0,0 +1,110 @@
+import uuid
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.keyspace import feedback_turns_key, session_key
+
+# 캐릭터를 고르지 않은 경우 기본 캐릭터 (6번 김수미)
+DEFAULT_CHARACTER_ID = 6
+
+# 턴 시작: 에피소드/캐릭터 저장, 턴 수 증가, 에피소드 변경 여부를 한 번에 처리
+# 새 세션(첫 턴)이면 세션 ID를 새로 발급하고, 새 세션이나 에피소드 변경이면 미리 생성한 턴 피드백을 비움
+_START_TURN_SCRIPT = """
+local previous = redis.call('HGET', KEYS[1], 'episode_id')
+redis.call('HSET', KEYS[1], 'episode_id', ARGV[1], 'character_id', ARGV[2])
+local count = redis.call('HINCRBY', KEYS[1], 'count', 1)
+local changed = 0
+if previous ~= ARGV[1] then
+    changed = 1
+end
+if count == 1 then
+    redis.call('HSET', KEYS[1], 'sid', ARGV[3])
+end
+if count == 1 or changed == 1 then
+    redis.call('DEL', KEYS[2])
+end
+return {count, changed}
+"""
+
+
+# 턴 완료 기록: 세션이 남아 있을 때만 완료한 가장 큰 턴 번호 갱신 (정리된 세션을 다시 만들지 않음)
+_FINISH_TURN_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local done = tonumber(redis.call('HGET', KEYS[1], 'done') or '0')
+if tonumber(ARGV[1]) > done then
+    redis.call('HSET', KEYS[1], 'done', ARGV[1])
+end
+return 1
+"""
+
+
+@dataclass
+class ChatSession:
+    """사용자의 현재 대화 세션 상태"""
+    episode_id: Optional[int]
+    character_id: int
+    count: int
+
+
+class SessionStore:
+    """
+    사용자 대화 세션 저장소 (Redis 해시 session:{email})
+
+    에피소드, 캐릭터, 턴 수, 처리가 끝난 턴 번호, 세션 ID를 해시 하나에 모아 두고
+    턴 시작 시 Lua 스크립트 한 번으로 갱신합니다.
+    """
+
+    def __init__(self, redis_client: redis.Redis):
+        self._redis = redis_client
+        self._start_turn_script = redis_client.register_script(_START_TURN_SCRIPT)
+        self._finish_turn_script = redis_client.register_script(_FINISH_TURN_SCRIPT)
+
+    async def start_turn(self, user_email: str, episode_id: int, character_id: int) -> Tuple[int, bool]:
+        """
+        새 턴 기록
+
+        Returns:
+            (누적 턴 수, 이전 턴과 에피소드가 달라졌는지 여부)
+        """
+        count, changed = await self._start_turn_script(
+            keys=[session_key(user_email), feedback_turns_key(user_email)],
+            args=[episode_id, character_id, uuid.uuid4().hex],
+        )
+        return int(count), bool(changed)
+
+    async def previous_turn_done(self, user_email: str, turn: int) -> bool:
+        """
+        바로 앞 턴(turn - 1)의 처리가 끝났는지 확인
+
+        세션이 정리되거나 새로 시작돼 턴 수가 turn보다 작으면 기다릴 턴이 없으므로 True
+        """
+        count, done = await self._redis.hmget(session_key(user_email), "count", "done")
+        return int(done or 0) >= turn - 1 or int(count or 0) < turn
+
+    async def finish_turn(self, user_email: str, turn: int) -> None:
+        """턴 처리 완료 기록 (성공/실패 모두, 다음 턴이 진행할 수 있도록)"""
+        await self._finish_turn_script(keys=[session_key(user_email)], args=[turn])
+
+    async def get_session_id(self, user_email: str) -> Optional[str]:
+        """현재 세션 ID (첫 턴에 발급, 세션이 정리되면 None)"""
+        return await self._redis.hget(session_key(user_email), "sid")
+
+    async def get(self, user_email: str) -> ChatSession:
+        """현재 세션 상태 조회"""
+        episode_id, character_id, count = await self._redis.hmget(
+            session_key(user_email), "episode_id", "character_id", "count"
+        )
+        return ChatSession(
+            episode_id=int(episode_id) if episode_id else None,
+            character_id=int(character_id) if character_id else DEFAULT_CHARACTER_ID,
+            count=int(count) if count else 0,
+        )
+
+    async def get_episode_id(self, user_email: str) -> Optional[int]:
+        """현재 에피소드 ID"""
+        episode_id = await self._redis.hget(session_key(user_email), "episode_id")
+        return int(episode_id) if episode_id else None
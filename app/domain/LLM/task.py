@@ -1,85 +1,242 @@
 from app.core.celery_app import celery_app
 from app.core.database import SessionLocal
-from app.core.redis import get_sync_redis
+from app.core.redis import REDIS_MEMORY, REDIS_RESULTS, get_redis_pool
+from app.core.event_loop import get_worker_loop, run_coroutine
+from app.core.pubsub import publish_message
+from app.core.idempotency import release_idempotency_key
 from app.core.config import settings
-from app.domain.character.model import CharacterInfo
-from app.domain.episode.model import Episode
+from app.core.metrics import record_cache, record_stage, stage_timer
+from app.core.routing import CHAT_TASK
+from app.core.keyspace import (
+    delete_user_session_keys,
+    memory_compacting_key,
+    talk_content_key,
+)
 from app.domain.user.model import User
-from app.domain.LLM.memory import (
-    append_memory,
-    build_conversation_history,
-    get_user_memory,
-    reset_user_memory,
+from app.domain.user.repository import ChatRoomRepository
+from app.domain.LLM.catalog import get_episode_content, get_character_script
+from app.domain.LLM.provider import get_llm_provider
+from app.domain.LLM.response_cache import ResponseCache, make_response_cache_key
+from app.domain.LLM.memory import AsyncConversationStore, WarmConversationCache, needs_compaction
+from app.domain.LLM.session import SessionStore
+from app.domain.LLM.feedback import (
+    apply_feedback_fold,
+    claim_feedback_fold,
+    deliver_feedback,
+    generate_feedback,
+    load_result_inputs,
+    next_fold_chunk,
+    release_feedback_fold,
+    store_turn_feedback,
+    summarize_feedback_chunk,
 )
-import google.generativeai as genai
+from typing import List, Optional, Set
+import asyncio
 import json
 import logging
+import time
 
 # 로거 설정
 logger = logging.getLogger(__name__)
 
-# Gemini API 키 설정
-genai.configure(api_key=settings.LLM_API_KEY)
 
-@celery_app.task
+def _load_user_id(user_email: str) -> int:
+    """이메일로 사용자 ID를 DB에서 조회"""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == user_email).first()
+        if not user:
+            raise ValueError(f"User not found for email: {user_email}")
+        return user.id
+    finally:
+        db.close()
+
+
+# 샤드 워커가 담당 사용자의 대화 기록을 재사용하기 위한 로컬 캐시
+_warm_history = WarmConversationCache(
+    max_size=settings.MEMORY_WARM_CACHE_SIZE,
+    ttl_seconds=settings.MEMORY_WARM_CACHE_TTL_SECONDS,
+)
+
+# 채팅 턴과 분리해 실행 중인 코루틴 (워커 이벤트 루프는 태스크가 끝나도 계속 돌아감)
+_background_tasks: Set[asyncio.Task] = set()
+
+# 앞 턴이 아직 처리 중일 때 다시 큐에 넣는 지연 (초, 재시도마다 두 배)
+_TURN_ORDER_RETRY_MIN_SECONDS = 0.05
+_TURN_ORDER_RETRY_MAX_SECONDS = 0.5
+_PREVIOUS_TURN_PENDING = object()
+
+
+# 프롬프트에 쓰는 대화 역할 이름
+_HISTORY_ROLE_LABELS = {
+    "system": "Summary of earlier conversation",
+    "user": "User",
+    "assistant": "Assistant",
+}
+
+
+def build_chat_prompt(
+    character_script: str,
+    episode_content: str,
+    conversation_history: List[dict],
+    user_message: str,
+) -> str:
+    """캐릭터 응답 생성용 프롬프트 (대화 기록은 텍스트로 변환, 압축된 요약은 system 메시지)"""
+    system_prompt = (
+        f"You are character with {character_script} when a subordinate who is dealing with is {episode_content}. "
+        "What are you going to say in this situation? "
+        "You must provide answer in Korean. "
+        "Generate answers in 40 Korean characters."
+    )
+
+    history_text = "\n".join([
+        f"{_HISTORY_ROLE_LABELS.get(msg['role'], 'Assistant')}: {msg['content']}"
+        for msg in conversation_history
+    ])
+
+    return f"{system_prompt}\n\n{history_text}\n\nUser: {user_message}\nAssistant:"
+
+
+# 채팅/피드백은 결과를 바로 발행하므로 재실행 시 중복 메시지가 생김 -> 받자마자 ack
+# 앞 턴을 기다리는 재시도 횟수는 CHAT_TURN_ORDER_TIMEOUT_SECONDS로 제한하므로 max_retries 없음
+@celery_app.task(bind=True, acks_late=False, max_retries=None)
 def get_llm_message(
+    self,
     character_id: int,
     episode_id: int,
     user_email: str,
     user_id: int,
     user_message: str,
+    reset_memory: bool = False,
+    turn: Optional[int] = None,
+    turn_wait_started: Optional[float] = None,
 ):
-    db = SessionLocal()
-    redis_client = get_sync_redis()
-    
+    """
+    캐릭터 응답 생성 Celery 태스크
+
+    같은 사용자의 턴은 SessionStore.start_turn이 발급한 턴 번호 순서대로 처리합니다.
+    앞 턴이 아직 끝나지 않았으면 워커 슬롯을 잡고 기다리지 않고 짧은 지연 후 다시 큐에 넣으므로,
+    prefork 풀/prefetch 설정과 관계없이 앞 턴이 먼저 실행될 수 있습니다.
+    """
+    kwargs = {
+        "character_id": character_id,
+        "episode_id": episode_id,
+        "user_email": user_email,
+        "user_id": user_id,
+        "user_message": user_message,
+        "reset_memory": reset_memory,
+        "turn": turn,
+    }
+    started = turn_wait_started or time.time()
+    result = run_coroutine(_get_llm_message_in_order(turn_wait_started=started, **kwargs))
+    if result is _PREVIOUS_TURN_PENDING:
+        raise self.retry(
+            kwargs={**kwargs, "turn_wait_started": started},
+            countdown=min(_TURN_ORDER_RETRY_MIN_SECONDS * 2 ** self.request.retries, _TURN_ORDER_RETRY_MAX_SECONDS),
+        )
+    return result
+
+
+async def _get_llm_message_in_order(
+    user_email: str,
+    turn_wait_started: float,
+    turn: Optional[int] = None,
+    **kwargs,
+):
+    """
+    앞 턴이 끝났으면 이번 턴 처리 후 완료 기록, 아직이면 _PREVIOUS_TURN_PENDING 반환
+
+    앞 턴 태스크가 유실돼도 멈추지 않도록 CHAT_TURN_ORDER_TIMEOUT_SECONDS가 지나면 그대로 처리합니다.
+    """
+    if turn is None:
+        return await _get_llm_message(user_email=user_email, turn=turn, **kwargs)
+
+    redis_client = await get_redis_pool()
+    sessions = SessionStore(redis_client)
     try:
-        # DB 조회
-        episode = db.query(Episode).filter(Episode.id == episode_id).first()
-        character = db.query(CharacterInfo).filter(CharacterInfo.id == character_id).first()
-        
-        if not episode or not character:
-            raise ValueError(f"Data not found for episode_id={episode_id} or character_id={character_id}")
+        if not await sessions.previous_turn_done(user_email, turn):
+            if time.time() - turn_wait_started < settings.CHAT_TURN_ORDER_TIMEOUT_SECONDS:
+                return _PREVIOUS_TURN_PENDING
+            logger.warning(f"Turn {turn - 1} of {user_email} not finished in time, processing turn {turn} anyway")
+        record_stage(CHAT_TASK, "turn_wait", time.time() - turn_wait_started)
+        try:
+            return await _get_llm_message(user_email=user_email, turn=turn, **kwargs)
+        finally:
+            await sessions.finish_turn(user_email, turn)
+    finally:
+        await redis_client.aclose()
 
-        episode_content = episode.content
-        character_script = character.script
 
-        # LangChain 메모리 준비 (에피소드 변경 시 초기화)
-        memory_episode_key = f"memory_episode:{user_email}"
-        stored_episode_id = redis_client.get(memory_episode_key)
-        if stored_episode_id != str(episode_id):
-            reset_user_memory(user_email)
-            redis_client.set(memory_episode_key, episode_id)
-        get_user_memory(user_email)  # 메모리 초기화 보장
+async def _get_llm_message(
+    character_id: int,
+    episode_id: int,
+    user_email: str,
+    user_id: int,
+    user_message: str,
+    reset_memory: bool = False,
+    turn: Optional[int] = None,
+):
+    redis_client = await get_redis_pool()
+    memory_redis = await get_redis_pool(REDIS_MEMORY)
+    feedback_task = None
+    
+    try:
+        # 에피소드/캐릭터 조회 (프로세스 로컬 캐시, 미스일 때만 DB 조회)
+        with stage_timer(CHAT_TASK, "catalog"):
+            episode_content = await get_episode_content(episode_id)
+            character_script = await get_character_script(character_id)
+
+        # 대화 메모리 준비 (API가 에피소드 변경을 알려주면 초기화)
+        store = AsyncConversationStore(memory_redis)
+        with stage_timer(CHAT_TASK, "history_read"):
+            if reset_memory:
+                await store.reset(user_email)
+            conversation_history = await _warm_history.load(store, user_email)
 
-        conversation_history = build_conversation_history(user_email)
+        # 이번 턴 피드백을 응답 생성과 동시에 미리 생성 (옵트인, 불러온 컨텍스트 재사용)
+        # 턴과 분리해 실행하므로 응답을 발행하면 다음 턴이 피드백 생성을 기다리지 않음
+        # 세션 ID는 지금 읽어 두고 저장할 때 비교 (생성 중 세션이 바뀌면 저장하지 않음)
+        if settings.LLM_SPECULATIVE_FEEDBACK_ENABLED and turn is not None:
+            session_id = await SessionStore(redis_client).get_session_id(user_email)
+            feedback_task = _spawn_background(_speculate_feedback(
+                user_email,
+                session_id,
+                turn,
+                character_script,
+                episode_content,
+                conversation_history + [{"role": "user", "content": user_message}],
+            ))
         
         # Gemini 프롬프트 구성
-        system_prompt = (
-            f"You are character with {character_script} when a subordinate who is dealing with is {episode_content}. "
-            "What are you going to say in this situation? "
-            "You must provide answer in Korean. "
-            "Generate answers in 40 Korean characters."
-        )
-        
-        # 대화 히스토리를 텍스트로 변환
-        history_text = "\n".join([
-            f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['content']}"
-            for msg in conversation_history
-        ])
-        
-        full_prompt = f"{system_prompt}\n\n{history_text}\n\nUser: {user_message}\nAssistant:"
-
-        # Gemini API 호출
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        response = model.generate_content(
-            full_prompt,
-            generation_config=genai.types.GenerationConfig(
-                max_output_tokens=200,
-                temperature=0.7,
+        full_prompt = build_chat_prompt(character_script, episode_content, conversation_history, user_message)
+
+        provider = get_llm_provider("chat")
+
+        # 응답 캐시 조회 (옵트인, 같은 대화 흐름이면 모델 호출 생략)
+        ai_message = None
+        response_cache = None
+        if settings.LLM_RESPONSE_CACHE_ENABLED:
+            cache_redis = await get_redis_pool(REDIS_RESULTS)
+            response_cache = ResponseCache(cache_redis)
+            cache_key = make_response_cache_key(
+                provider.model_name, character_id, episode_id, conversation_history, user_message
             )
-        )
+            with stage_timer(CHAT_TASK, "response_cache"):
+                ai_message = await response_cache.get(cache_key)
+            record_cache("response", ai_message is not None)
+
+        if ai_message is None:
+            # LLM 호출 (기본: Gemini)
+            with stage_timer(CHAT_TASK, "model"):
+                response = await provider.generate(
+                    [{"role": "user", "content": full_prompt}],
+                    max_output_tokens=200,
+                    temperature=0.7,
+                )
+            ai_message = response.text
 
-        ai_message = response.text.strip()
+            if response_cache is not None:
+                await response_cache.set(cache_key, ai_message)
 
         # Redis 채널로 발행 (WebSocket 전송)
         channel_name = f"chat_{user_id}"
@@ -87,14 +244,21 @@ def get_llm_message(
             "type": "llm_talk_message",
             "message": ai_message
         }
-        redis_client.publish(channel_name, json.dumps(message_data))
+        with stage_timer(CHAT_TASK, "publish"):
+            await publish_message(channel_name, json.dumps(message_data))
 
         # 결과 저장 (Redis)
-        redis_client.set(f"talk_content:{user_email}", ai_message)
+        await redis_client.set(talk_content_key(user_email), ai_message)
 
-        # LangChain 메모리에 대화 내용 저장
+        # 대화 메모리에 저장
         if user_message and ai_message:
-            append_memory(user_email, user_message, ai_message)
+            with stage_timer(CHAT_TASK, "history_write"):
+                message_count = await _warm_history.append_turn(store, user_email, user_message, ai_message)
+
+            # 기준을 넘으면 백그라운드에서 오래된 턴을 요약으로 압축 (사용자당 하나만)
+            if needs_compaction(message_count):
+                if await memory_redis.set(memory_compacting_key(user_email), 1, nx=True, ex=300):
+                    compact_conversation_memory.delay(user_email, episode_id)
 
         # TTS 로직 추가 예정
 
@@ -102,14 +266,48 @@ def get_llm_message(
 
     except Exception as e:
         logger.error(f"Error in get_llm_message task: {e}", exc_info=True)
+        if feedback_task is not None:
+            feedback_task.cancel()
         raise
     finally:
-        if redis_client:
-            redis_client.close()
-        db.close()
+        await redis_client.aclose()
+        await memory_redis.aclose()
+
+
+def _spawn_background(coro) -> asyncio.Task:
+    """
+    태스크 완료를 기다리지 않는 코루틴 실행
+
+    워커 루프의 동시 실행 제한(LLM_ASYNC_MAX_INFLIGHT)을 함께 받고,
+    끝날 때까지 참조를 유지해 GC로 사라지지 않도록 합니다.
+    """
+    task = asyncio.create_task(get_worker_loop().limited(coro))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
 
 
-@celery_app.task
+async def _speculate_feedback(
+    user_email: str,
+    session_id: Optional[str],
+    turn: int,
+    character_script: str,
+    episode_content: str,
+    conversation_history: List[dict],
+) -> None:
+    """턴 피드백을 미리 생성해 저장 (실패해도 채팅 응답에는 영향 없음)"""
+    redis_client = await get_redis_pool()
+    try:
+        feedback = await generate_feedback(character_script, episode_content, conversation_history)
+        if not await store_turn_feedback(redis_client, user_email, session_id, turn, feedback):
+            logger.info(f"Dropped speculative feedback for {user_email} turn {turn}: session changed")
+    except Exception as e:
+        logger.warning(f"Speculative feedback failed for {user_email} turn {turn}: {e}")
+    finally:
+        await redis_client.aclose()
+
+
+@celery_app.task(acks_late=False)
 def get_gpt_feedback(user_email: str):
     """
     사용자의 대화 내역을 분석하여 피드백을 생성하는 Celery 태스크
@@ -120,88 +318,40 @@ def get_gpt_feedback(user_email: str):
     Returns:
         str: 생성된 피드백 텍스트
     """
-    db = SessionLocal()
-    redis_client = get_sync_redis()
+    return run_coroutine(_get_gpt_feedback(user_email))
+
+
+async def _get_gpt_feedback(user_email: str):
+    redis_client = await get_redis_pool()
     
     try:
         # DB에서 사용자 정보 조회
-        user = db.query(User).filter(User.email == user_email).first()
-        if not user:
-            raise ValueError(f"User not found for email: {user_email}")
+        user_id = await asyncio.to_thread(_load_user_id, user_email)
         
-        user_id = user.id
-        
-        # Redis에서 episode_id와 character_id 조회
-        episode_id = redis_client.get(f"episode_id:{user_email}")
-        if not episode_id:
+        # Redis 세션에서 episode_id와 character_id 조회
+        session = await SessionStore(redis_client).get(user_email)
+        if session.episode_id is None:
             raise ValueError(f"episode_id not found in Redis for user: {user_email}")
         
-        episode_id = int(episode_id.decode() if isinstance(episode_id, bytes) else episode_id)
-        
-        character_id = redis_client.get(f"character_id:{user_email}")
-        if not character_id:
-            # 기본값으로 6번(김수미) 사용
-            character_id = 6
-        else:
-            character_id = int(character_id.decode() if isinstance(character_id, bytes) else character_id)
+        # 에피소드/캐릭터 조회 (프로세스 로컬 캐시)
+        episode_content = await get_episode_content(session.episode_id)
+        character_script = await get_character_script(session.character_id)
         
-        # DB 조회
-        episode = db.query(Episode).filter(Episode.id == episode_id).first()
-        character = db.query(CharacterInfo).filter(CharacterInfo.id == character_id).first()
+        # 대화 메모리에서 대화 내역 가져오기
+        memory_redis = await get_redis_pool(REDIS_MEMORY)
+        try:
+            conversation_history = await AsyncConversationStore(memory_redis).load(user_email)
+        finally:
+            await memory_redis.aclose()
         
-        if not episode or not character:
-            raise ValueError(f"Data not found for episode_id={episode_id} or character_id={character_id}")
+        result = await generate_feedback(character_script, episode_content, conversation_history)
         
-        episode_content = episode.content
-        character_script = character.script
+        # Redis에 피드백 저장 후 pub/sub으로 전송
+        feedback_count = await deliver_feedback(redis_client, user_email, user_id, result)
         
-        # LangChain 메모리에서 대화 내역 가져오기
-        conversation_history = build_conversation_history(user_email)
-        
-        # 대화 내역을 문자열로 변환 (프롬프트에 사용하기 위해)
-        conversation_text = "\n".join([
-            f"{msg['role']}: {msg['content']}"
-            for msg in conversation_history
-        ])
-        
-        # GPT-4o로 피드백 생성
-        response = openai.ChatCompletion.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"""
-                    conversation : {conversation_text}
-                    You are character with {character_script}. In {episode_content}, Look at this conversation and give the feedback.\
-                    Give me feedback on the answer\
-                    You must give feedback only to user's answer.\
-                    Feedback means scolding a person for what he or she did well and what he or she didn't do in his or her answer and telling him or her how to say it.\
-                    You have to give "user" a stinging piece of advice in that conversation\
-                    You need to see the answer of "user" in that conversation and give feedback.\
-                    You have to speak strongly so that you can come to your senses.\
-                    You must provide answer in Korean.\
-                    Don't generate the questions given earlier, just generate the answers.\
-                    When you generating an answer, don't explain the answer or question in advance, just create an answer.\
-                    Generate answers in 90 Korean characters.\
-                    When you answer, don't use numbers like 1, 2, 3 and use conjunctions to make the flow of the text natural.\
-                    """
-                },
-            ],
-        )
-        
-        result = response.choices[0].message["content"].strip()
-        
-        # Redis에 피드백 저장 (List 사용)
-        redis_key = f"feedbacks:{user_email}"
-        redis_client.rpush(redis_key, result)
-        
-        # Redis pub/sub으로 피드백 전송
-        channel_name = f"chat_{user_id}"
-        message_data = {
-            "type": "gpt_feedback_message",
-            "message": result,
-        }
-        redis_client.publish(channel_name, json.dumps(message_data))
+        # 피드백이 한 묶음 쌓이면 백그라운드에서 부분 요약으로 접음
+        if await claim_feedback_fold(redis_client, user_email, feedback_count):
+            fold_feedback.delay(user_email)
         
         # TTS 로직 추가 예정
         # text_to_speech_file(result, character_id, user_id)
@@ -212,12 +362,11 @@ def get_gpt_feedback(user_email: str):
         logger.error(f"Error in get_gpt_feedback task: {e}", exc_info=True)
         raise
     finally:
-        if redis_client:
-            redis_client.close()
-        db.close()
+        await redis_client.aclose()
 
 
-@celery_app.task
+# 결과 생성/압축은 다시 실행해도 안전하므로 완료 후 ack (워커가 죽으면 다른 워커가 재처리)
+@celery_app.task(acks_late=True, reject_on_worker_lost=True)
 def get_gpt_result(user_email: str):
     """
     모든 피드백을 종합하여 최종 결과를 생성하는 Celery 태스크
@@ -228,69 +377,253 @@ def get_gpt_result(user_email: str):
     Returns:
         str: 생성된 최종 피드백 텍스트
     """
-    db = SessionLocal()
-    redis_client = get_sync_redis()
+    return run_coroutine(_get_gpt_result(user_email))
+
+
+async def _get_gpt_result(user_email: str):
+    redis_client = await get_redis_pool()
     
     try:
-        # Redis에서 character_id 조회
-        character_id = redis_client.get(f"character_id:{user_email}")
-        if not character_id:
-            # 기본값으로 6번(김수미) 사용
-            character_id = 6
-        else:
-            character_id = int(character_id.decode() if isinstance(character_id, bytes) else character_id)
-        
-        # DB에서 캐릭터 정보 조회
-        character = db.query(CharacterInfo).filter(CharacterInfo.id == character_id).first()
-        if not character:
-            raise ValueError(f"Character not found for character_id={character_id}")
-        
-        character_script = character.script
-        
-        # Redis에서 모든 피드백 가져오기 (List 사용)
-        feedback_key = f"feedbacks:{user_email}"
-        feedback_values = redis_client.lrange(feedback_key, 0, -1)
-        
-        if not feedback_values:
-            raise ValueError(f"No feedbacks found for user: {user_email}")
-        
-        # 바이트를 문자열로 변환 (필요한 경우)
-        feedback_values = [
-            value.decode() if isinstance(value, bytes) else value
-            for value in feedback_values
-        ]
-        feedback_values_str = ", ".join(feedback_values)
-        
-        # GPT-4o로 최종 피드백 생성
-        response = openai.ChatCompletion.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"""
-                    You are character with {character_script}.
-                    {feedback_values_str}, Look at those feedbacks and write the final feedback.\
-                    Feedback means scolding a person for what he or she did well and what he or she didn't do in his or her answer and telling him or her how to say it.\
-                    You must provide answer in Korean.\
-                    You must never use profanity.\
-                    Don't generate the questions given earlier, just generate the answers.\
-                    When you generating an answer, don't explain the answer or question in advance, just create an answer.\
-                    Generate answers in 300 Korean characters.\
-                    When you answer, don't use numbers like 1, 2, 3 and use conjunctions to make the flow of the text natural.\
-                    """
-                },
-            ],
-        )
-        
-        result = response.choices[0].message["content"].strip()
-        
-        return result
+        return await _generate_gpt_result(redis_client, user_email)
         
     except Exception as e:
         logger.error(f"Error in get_gpt_result task: {e}", exc_info=True)
         raise
     finally:
-        if redis_client:
-            redis_client.close()
+        await redis_client.aclose()
+
+
+async def _generate_gpt_result(redis_client, user_email: str) -> str:
+    """모든 피드백을 종합한 최종 결과 생성"""
+    # Redis에서 character_id 조회 후 캐릭터 정보 조회 (프로세스 로컬 캐시)
+    session = await SessionStore(redis_client).get(user_email)
+    character_script = await get_character_script(session.character_id)
+    
+    # 부분 요약 + 아직 접지 않은 최근 피드백만 가져오기 (세션 길이와 무관하게 프롬프트 크기 제한)
+    feedback_values = await load_result_inputs(redis_client, user_email)
+    
+    if not feedback_values:
+        raise ValueError(f"No feedbacks found for user: {user_email}")
+    
+    feedback_values_str = ", ".join(feedback_values)
+    
+    # LLM으로 최종 피드백 생성 (기본: GPT-4o)
+    response = await get_llm_provider("result").generate(
+        [
+            {
+                "role": "system",
+                "content": f"""
+                You are character with {character_script}.
+                {feedback_values_str}, Look at those feedbacks and write the final feedback.\
+                Feedback means scolding a person for what he or she did well and what he or she didn't do in his or her answer and telling him or her how to say it.\
+                You must provide answer in Korean.\
+                You must never use profanity.\
+                Don't generate the questions given earlier, just generate the answers.\
+                When you generating an answer, don't explain the answer or question in advance, just create an answer.\
+                Generate answers in 300 Korean characters.\
+                When you answer, don't use numbers like 1, 2, 3 and use conjunctions to make the flow of the text natural.\
+                """
+            },
+        ],
+    )
+    
+    return response.text
+
+
+def _load_room_result(room_id: int, user_id: int):
+    """채팅방에 저장된 결과 조회 (채팅방이 없으면 ValueError)"""
+    db = SessionLocal()
+    try:
+        room = ChatRoomRepository.get_by_id_and_user_id(db, room_id, user_id)
+        if not room:
+            raise ValueError(f"Chat room not found: {room_id}")
+        return room.result or None
+    finally:
+        db.close()
+
+
+def _save_room_result(room_id: int, user_id: int, result: str) -> None:
+    """채팅방 결과 저장"""
+    db = SessionLocal()
+    try:
+        if not ChatRoomRepository.update_result(db, room_id, user_id, result):
+            raise ValueError(f"Chat room not found: {room_id}")
+    finally:
         db.close()
 
+
+def finalize_idempotency_scope(user_id: int) -> str:
+    """채팅방 종료 태스크 중복 방지 키 범위 (키는 room_id, 값은 task_id)"""
+    return f"finalize_session:{user_id}"
+
+
+@celery_app.task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def finalize_session(self, user_email: str, user_id: int, room_id: int):
+    """
+    대화 세션 종료 처리 Celery 태스크
+
+    최종 결과 생성 -> chat_room.result 저장 -> Redis 세션 키 정리 -> chat_{user_id} 채널로 결과 발행.
+    이미 결과가 저장된 채팅방이면 생성 단계를 건너뛰므로 두 번 실행해도 안전합니다.
+    실패하면 chat_{user_id} 채널로 gpt_result_error를 발행하고 중복 방지 키를 풀어
+    다음 /results 요청이 새로 시도하도록 합니다.
+
+    Args:
+        user_email: 사용자 이메일
+        user_id: 사용자 ID
+        room_id: 결과를 저장할 채팅방 ID
+
+    Returns:
+        dict: {"result": 최종 결과, "room_id": 채팅방 ID}
+    """
+    return run_coroutine(_finalize_session(self.request.id, user_email, user_id, room_id))
+
+
+async def _finalize_session(task_id: str, user_email: str, user_id: int, room_id: int):
+    redis_client = await get_redis_pool()
+
+    try:
+        # 재시도라면 이미 저장된 결과 사용 (세션 키가 정리된 뒤에도 동작)
+        result = await asyncio.to_thread(_load_room_result, room_id, user_id)
+        if result is None:
+            result = await _generate_gpt_result(redis_client, user_email)
+            await asyncio.to_thread(_save_room_result, room_id, user_id, result)
+
+        await delete_user_session_keys(user_email)
+
+        message_data = {
+            "type": "gpt_result_message",
+            "message": result,
+            "room_id": room_id,
+        }
+        await publish_message(f"chat_{user_id}", json.dumps(message_data))
+
+        return {"result": result, "room_id": room_id}
+
+    except Exception as e:
+        logger.error(f"Error in finalize_session task: {e}", exc_info=True)
+        await _report_finalize_failure(redis_client, task_id, user_id, room_id)
+        raise
+    finally:
+        await redis_client.aclose()
+
+
+async def _report_finalize_failure(redis_client, task_id: str, user_id: int, room_id: int) -> None:
+    """종료 실패 알림 발행 후 이 태스크가 선점한 중복 방지 키 해제 (실패해도 원래 예외를 가리지 않음)"""
+    try:
+        await release_idempotency_key(redis_client, finalize_idempotency_scope(user_id), str(room_id), task_id)
+        message_data = {
+            "type": "gpt_result_error",
+            "message": "Result generation failed",
+            "room_id": room_id,
+        }
+        await publish_message(f"chat_{user_id}", json.dumps(message_data))
+    except Exception as e:
+        logger.warning(f"Could not report finalize_session failure for room {room_id}: {e}")
+
+
+@celery_app.task(acks_late=True, reject_on_worker_lost=True)
+def fold_feedback(user_email: str):
+    """
+    쌓인 피드백을 FEEDBACK_FOLD_CHUNK_SIZE개씩 부분 요약으로 접는 Celery 태스크
+
+    최종 결과 생성은 부분 요약과 남은 몇 개의 피드백만 합치므로
+    대화가 길어져도 세션 종료 시 프롬프트 크기와 지연이 일정하게 유지됩니다.
+
+    Args:
+        user_email: 사용자 이메일
+
+    Returns:
+        int: 이번에 접은 묶음 수
+    """
+    return run_coroutine(_fold_feedback(user_email))
+
+
+async def _fold_feedback(user_email: str):
+    redis_client = await get_redis_pool()
+
+    try:
+        folded_chunks = 0
+        while True:
+            folded, chunk = await next_fold_chunk(redis_client, user_email)
+            if not chunk:
+                return folded_chunks
+
+            partial = await summarize_feedback_chunk(chunk)
+            if not await apply_feedback_fold(redis_client, user_email, folded, len(chunk), partial):
+                # 세션이 정리됐거나 다른 곳에서 이미 접음
+                return folded_chunks
+            folded_chunks += 1
+
+    except Exception as e:
+        logger.error(f"Error in fold_feedback task: {e}", exc_info=True)
+        raise
+    finally:
+        await release_feedback_fold(redis_client, user_email)
+        await redis_client.aclose()
+
+
+@celery_app.task(acks_late=True, reject_on_worker_lost=True)
+def compact_conversation_memory(user_email: str, episode_id: int):
+    """
+    오래된 대화 턴을 요약으로 압축하는 Celery 태스크
+
+    최근 MEMORY_KEEP_RECENT_TURNS 턴만 원문으로 남기고 나머지는 기존 요약과 합쳐
+    하나의 요약으로 저장합니다.
+
+    Args:
+        user_email: 사용자 이메일
+        episode_id: 압축을 요청한 시점의 에피소드 ID
+
+    Returns:
+        str: 새 요약 (압축할 내용이 없으면 None)
+    """
+    return run_coroutine(_compact_conversation_memory(user_email, episode_id))
+
+
+async def _compact_conversation_memory(user_email: str, episode_id: int):
+    redis_client = await get_redis_pool()
+    memory_redis = await get_redis_pool(REDIS_MEMORY)
+
+    try:
+        store = AsyncConversationStore(memory_redis)
+        summary, older_messages, compacted_items = await store.compaction_candidates(
+            user_email, settings.MEMORY_KEEP_RECENT_TURNS * 2
+        )
+        if not older_messages:
+            return None
+
+        conversation_text = "\n".join([
+            f"{msg['role']}: {msg['content']}"
+            for msg in older_messages
+        ])
+        prompt = (
+            f"Previous summary: {summary or 'None'}\n"
+            f"Conversation:\n{conversation_text}\n\n"
+            "Merge the previous summary and the conversation into one concise summary. "
+            "Keep facts, promises and the user's attitude that later turns may refer to. "
+            "You must provide answer in Korean. "
+            "Generate the summary in 300 Korean characters."
+        )
+        response = await get_llm_provider("summary").generate(
+            [{"role": "user", "content": prompt}],
+            max_output_tokens=400,
+            temperature=0.3,
+        )
+
+        # 압축 중에 에피소드가 바뀌어 메모리가 초기화됐다면 결과를 버림
+        if await SessionStore(redis_client).get_episode_id(user_email) != episode_id:
+            return None
+
+        # 압축 중에 기록이 초기화/재작성됐으면(세션 종료 후 새 세션 등) 결과를 버림
+        if not await store.apply_compaction(user_email, response.text, summary, compacted_items):
+            logger.info(f"Conversation memory changed during compaction, discarding summary for {user_email}")
+            return None
+        return response.text
+
+    except Exception as e:
+        logger.error(f"Error in compact_conversation_memory task: {e}", exc_info=True)
+        raise
+    finally:
+        await memory_redis.delete(memory_compacting_key(user_email))
+        await memory_redis.aclose()
+        await redis_client.aclose()
@@ -0,0 +1,12 @@
+from sqlalchemy.orm import Session
+from app.domain.character.model import CharacterInfo
+from typing import Optional
+
+
+class CharacterRepository:
+    """Character 도메인 데이터베이스 접근 레이어"""
+
+    @staticmethod
+    def get_by_id(db: Session, character_id: int) -> Optional[CharacterInfo]:
+        """ID로 캐릭터 조회"""
+        return db.query(CharacterInfo).filter(CharacterInfo.id == character_id).first()
@@ -0,0 +1,12 @@
+from sqlalchemy.orm import Session
+from app.domain.episode.model import Episode
+from typing import Optional
+
+
+class EpisodeRepository:
+    """Episode 도메인 데이터베이스 접근 레이어"""
+
+    @staticmethod
+    def get_by_id(db: Session, episode_id: int) -> Optional[Episode]:
+        """ID로 에피소드 조회"""
+        return db.query(Episode).filter(Episode.id == episode_id).first()
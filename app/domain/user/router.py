@@ -4,6 +4,7 @@ from sqlalchemy import and_
 import redis.asyncio as redis
 
 from app.core.dependencies import get_db, get_redis_client
+from app.core.keyspace import delete_user_session_keys
 from app.core.security import (
     create_access_token,
     create_refresh_token,
@@ -164,9 +165,8 @@ async def logout(
                 blacklist_key = f"blacklist:refresh:{request.refresh_token}"
                 await redis_client.setex(blacklist_key, ttl, "1")
         
-        # Redis에서 사용자 관련 키 삭제
-        async for key in redis_client.scan_iter(match=f"*{user.email}*"):
-            await redis_client.delete(key)
+        # Redis에서 사용자 세션 키 삭제 (등록된 키만 한 번에 삭제)
+        await delete_user_session_keys(user.email)
         
         # 204 No Content는 본문을 반환하지 않음
         return None
@@ -1,9 +1,28 @@
-from fastapi import FastAPI, APIRouter
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, APIRouter, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.domain.LLM.router import router as llm_router
 from app.domain.user.router import router as user_router
 from app.domain.chatroom.router import router as chatroom_router
 from app.core.database import engine, Base
+from app.core.metrics import metrics_middleware, render_metrics
+from app.core.tracing import tracing_middleware
+from app.core.pubsub import get_pubsub_hub
+from app.core.redis import REDIS_PUBSUB, REDIS_RESULTS
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 시작/종료 시 공유 리소스 관리"""
+    # 프로세스당 용도별 pub/sub 커넥션 하나씩 (WebSocket 전송용 / 태스크 완료 알림용)
+    hubs = [get_pubsub_hub(REDIS_PUBSUB), get_pubsub_hub(REDIS_RESULTS)]
+    for hub in hubs:
+        await hub.start()
+    try:
+        yield
+    finally:
+        for hub in hubs:
+            await hub.stop()
 
 
 def create_app() -> FastAPI:
@@ -16,7 +35,8 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title="My Chat Application",
         description="API for Chat Service",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan
     )
 
 
@@ -37,6 +57,17 @@ def create_app() -> FastAPI:
             "service": "EasyThon Backend"
         }
 
+    # Prometheus 지표
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
+    # 요청 지연 지표
+    app.middleware("http")(metrics_middleware)
+    # 요청 추적 (trace ID를 Celery 태스크까지 전달)
+    app.middleware("http")(tracing_middleware)
+
     # CORS 설정
     app.add_middleware(
         CORSMiddleware,
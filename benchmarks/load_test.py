@@ -0,0 +1,285 @@
+"""
+엔드투엔드 부하 테스트
+
+가상 사용자마다 회원가입 -> 로그인 -> WebSocket 연결 -> 채팅 턴 반복(/message) ->
+피드백(/feedbacks) -> 결과(/results) 흐름을 실행하고,
+엔드포인트별 응답 시간과 WebSocket으로 결과를 받기까지의 완료 시간을 p50/p95/p99로 보고합니다.
+
+스텁 LLM, 로컬 Redis, SQLite(또는 로컬 MySQL)로 외부 서비스 없이 실행할 수 있습니다.
+
+    export DATABASE_URL=sqlite:////tmp/loadtest.db
+    export CELERY_BROKER_URL=redis://localhost:6379/1 CELERY_RESULT_BACKEND=redis://localhost:6379/0
+    export LLM_CHAT_PROVIDER=stub LLM_FEEDBACK_PROVIDER=stub LLM_RESULT_PROVIDER=stub LLM_SUMMARY_PROVIDER=stub
+    export RATE_LIMIT_ENABLED=false
+
+    PYTHONPATH=. python benchmarks/load_test.py seed
+    uvicorn app.main:app --port 8000 &
+    celery -A app.core.celery_app.celery_app worker -Q llm.chat,llm.feedback,llm.result &
+    PYTHONPATH=. python benchmarks/load_test.py run --users 50 --turns 5 --fail-p95 turn=3000
+
+결과 흐름(--results)은 채팅방 생성 단계를 대신하기 위해 이 스크립트가 같은 DB/Redis에
+채팅방과 room_id 키를 직접 만듭니다. 같은 환경 변수로 실행해야 합니다.
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+import websockets
+
+# 엔드포인트별 응답 시간과 완료 시간 (밀리초)
+Samples = Dict[str, List[float]]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """최근접 순위 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def _import_models() -> None:
+    """외래 키가 서로 참조하므로 모든 모델을 먼저 등록"""
+    from app.domain.character import model as character_model  # noqa: F401
+    from app.domain.chatroom import model as chatroom_model  # noqa: F401
+    from app.domain.episode import model as episode_model  # noqa: F401
+    from app.domain.user import model as user_model  # noqa: F401
+
+
+def seed(characters: int, episodes: int) -> None:
+    """테이블 생성 후 캐릭터/에피소드 기본 데이터 입력 (이미 있으면 건너뜀)"""
+    from app.core.database import Base, SessionLocal, engine
+    from app.domain.character.model import CharacterInfo
+    from app.domain.episode.model import Episode, EpisodeTime
+
+    _import_models()
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.get(EpisodeTime, 1) is None:
+            db.add(EpisodeTime(id=1, time="오전 10시"))
+        for character_id in range(1, characters + 1):
+            if db.get(CharacterInfo, character_id) is None:
+                db.add(CharacterInfo(id=character_id, name=f"캐릭터{character_id}", script="깐깐한 팀장"))
+        for episode_id in range(1, episodes + 1):
+            if db.get(Episode, episode_id) is None:
+                db.add(Episode(id=episode_id, episode_time_id=1, content="보고서 마감을 놓친 상황"))
+        db.commit()
+    finally:
+        db.close()
+    print(f"Seeded {characters} characters and {episodes} episodes")
+
+
+async def prepare_room(user_email: str, user_id: int, character_id: int) -> int:
+    """결과 흐름용 채팅방 생성 후 room_id:{email} 키 설정"""
+    from app.core.database import SessionLocal
+    from app.core.keyspace import room_id_key
+    from app.core.redis import get_redis_pool
+    from app.domain.chatroom.model import ChatRoom
+
+    _import_models()
+
+    def create() -> int:
+        db = SessionLocal()
+        try:
+            room = ChatRoom(user_id=user_id, character_id=character_id)
+            db.add(room)
+            db.commit()
+            return room.id
+        finally:
+            db.close()
+
+    room_id = await asyncio.to_thread(create)
+    redis_client = await get_redis_pool()
+    try:
+        await redis_client.set(room_id_key(user_email), room_id)
+    finally:
+        await redis_client.aclose()
+    return room_id
+
+
+class VirtualUser:
+    """가상 사용자 한 명의 시나리오"""
+
+    def __init__(self, index: int, args: argparse.Namespace, samples: Samples, errors: Dict[str, int]):
+        self.index = index
+        self.args = args
+        self.samples = samples
+        self.errors = errors
+        self.email = f"load-{args.run_id}-{index}@example.com"
+        self.password = "loadtest-password"
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        self.samples[name].append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+            return None
+        return response
+
+    async def wait_for(self, socket, message_type: str, name: str, started: float) -> bool:
+        """WebSocket으로 해당 종류의 메시지를 받을 때까지 대기 (완료 시간 기록)"""
+        try:
+            while True:
+                data = json.loads(await asyncio.wait_for(socket.recv(), timeout=self.args.timeout))
+                if data.get("type") == message_type:
+                    self.samples[name].append((time.perf_counter() - started) * 1000)
+                    return True
+        except (asyncio.TimeoutError, websockets.ConnectionClosed):
+            self.errors[name] += 1
+            return False
+
+    async def run(self, client: httpx.AsyncClient) -> None:
+        await asyncio.sleep(self.args.ramp_up * self.index / max(1, self.args.users))
+
+        response = await self.request(client, "register", "POST", "/api/user/register", json={
+            "email": self.email, "password": self.password, "name": f"load{self.index}",
+        })
+        if response is None:
+            return
+        response = await self.request(client, "login", "POST", "/api/user/login", json={
+            "email": self.email, "password": self.password,
+        })
+        if response is None:
+            return
+        token = response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        ws_url = self.args.base_url.replace("http", "ws", 1) + "/api/llm/ws"
+        async with websockets.connect(ws_url, subprotocols=["bearer", token]) as socket:
+            character_id = 1 + self.index % self.args.characters
+            for turn in range(self.args.turns):
+                started = time.perf_counter()
+                response = await self.request(client, "message", "POST", "/api/llm/message", headers=headers, json={
+                    "character_id": character_id,
+                    "episode_id": 1,
+                    "user_message": f"{turn}번째 답변입니다. 죄송하지만 마감을 하루만 미뤄주실 수 있을까요?",
+                })
+                if response is None or not await self.wait_for(socket, "llm_talk_message", "turn", started):
+                    return
+
+                if self.args.feedback:
+                    started = time.perf_counter()
+                    response = await self.request(client, "feedbacks", "GET", "/api/llm/feedbacks", headers=headers)
+                    if response is None or not await self.wait_for(socket, "gpt_feedback_message", "feedback_done", started):
+                        return
+                await asyncio.sleep(self.args.think_time)
+
+            if self.args.results:
+                user_id = int(_token_subject(token))
+                await prepare_room(self.email, user_id, character_id)
+                started = time.perf_counter()
+                response = await self.request(client, "results", "GET", "/api/llm/results", headers=headers)
+                if response is not None:
+                    await self.wait_for(socket, "gpt_result_message", "result_done", started)
+
+
+def _token_subject(token: str) -> str:
+    from jose import jwt
+
+    return jwt.get_unverified_claims(token)["sub"]
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, dict]:
+    samples: Samples = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users * 2)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        users = [VirtualUser(index, args, samples, errors) for index in range(args.users)]
+        await asyncio.gather(*(user.run(client) for user in users))
+    elapsed = time.perf_counter() - started
+
+    report = {}
+    for name in sorted(set(samples) | set(errors)):
+        values = samples.get(name, [])
+        report[name] = {
+            "count": len(values),
+            "errors": errors.get(name, 0),
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "p99_ms": round(percentile(values, 99), 1),
+            "max_ms": round(max(values), 1) if values else 0.0,
+        }
+    return report
+
+
+def print_report(report: Dict[str, dict]) -> None:
+    print(f"{'name':<16}{'count':>8}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, row in report.items():
+        print(
+            f"{name:<16}{row['count']:>8}{row['errors']:>8}{row['rps']:>9}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}"
+        )
+
+
+def check_thresholds(report: Dict[str, dict], thresholds: List[str]) -> List[str]:
+    """--fail-p95 name=ms 기준을 넘은 항목 (오류가 있어도 실패)"""
+    failures = []
+    for threshold in thresholds:
+        name, limit = threshold.split("=", 1)
+        row = report.get(name)
+        if row is None or row["count"] == 0:
+            failures.append(f"{name}: no samples")
+        elif row["p95_ms"] > float(limit):
+            failures.append(f"{name}: p95 {row['p95_ms']}ms > {limit}ms")
+    for name, row in report.items():
+        if row["errors"]:
+            failures.append(f"{name}: {row['errors']} errors")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="create tables and catalog rows")
+    seed_parser.add_argument("--characters", type=int, default=6)
+    seed_parser.add_argument("--episodes", type=int, default=1)
+
+    run_parser = commands.add_parser("run", help="run the load scenario")
+    run_parser.add_argument("--base-url", default="http://localhost:8000")
+    run_parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    run_parser.add_argument("--turns", type=int, default=3, help="chat turns per user")
+    run_parser.add_argument("--characters", type=int, default=6)
+    run_parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds to start all users")
+    run_parser.add_argument("--think-time", type=float, default=0.0, help="seconds between turns")
+    run_parser.add_argument("--timeout", type=float, default=60.0)
+    run_parser.add_argument("--no-feedback", dest="feedback", action="store_false")
+    run_parser.add_argument("--results", action="store_true", help="also finish each session via /results")
+    run_parser.add_argument("--json", help="write the report to this path")
+    run_parser.add_argument("--fail-p95", action="append", default=[], metavar="NAME=MS")
+    run_parser.add_argument("--run-id", default=uuid.uuid4().hex[:8])
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        seed(args.characters, args.episodes)
+        return 0
+
+    report = asyncio.run(run_load(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    failures = check_thresholds(report, args.fail_p95)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+핫 경로 마이크로벤치마크
+
+요청/턴마다 실행되는 함수의 1회 실행 시간을 측정하고, 저장된 기준값과 비교합니다.
+
+    PYTHONPATH=. python benchmarks/microbench.py
+    PYTHONPATH=. python benchmarks/microbench.py --filter security
+    PYTHONPATH=. python benchmarks/microbench.py --save benchmarks/baseline.json
+    PYTHONPATH=. python benchmarks/microbench.py --compare benchmarks/baseline.json --fail-threshold 25
+
+memory.build_conversation_history 항목은 설정의 메모리 Redis(REDIS_MEMORY_URL 또는
+CELERY_RESULT_BACKEND)에 벤치마크용 키를 만들어 측정하며, 연결할 수 없으면 건너뜁니다.
+기준값은 측정한 머신에 따라 달라지므로 같은 머신에서 만든 기준값과 비교해야 합니다.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Tuple
+
+# 기록 길이별 측정 (메시지 수)
+HISTORY_LENGTHS = (10, 50, 200)
+# ChatHistoryResponse 메시지 수
+RESPONSE_SIZES = (100, 1000, 5000)
+
+KOREAN_TEXT = "네가 한 말은 방향은 맞았지만 상사의 입장을 먼저 생각하지 않았어. 다음에는 상황을 정리해서 말해 봐."
+
+# 이름 -> 측정할 함수를 만드는 팩토리 (준비 작업은 팩토리에서, 측정은 반환된 함수만)
+_CASES: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def case(name: str):
+    def register(factory: Callable[[], Callable[[], object]]):
+        _CASES[name] = factory
+        return factory
+    return register
+
+
+class SkipCase(Exception):
+    """환경이 없어 측정하지 않는 항목"""
+
+
+def _run_coroutine(coro):
+    """await 없이 끝나는 코루틴을 이벤트 루프 없이 실행"""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+
+def _history(length: int) -> List[dict]:
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": KOREAN_TEXT[: 20 + i % 40]}
+        for i in range(length)
+    ]
+
+
+@case("security.decode_token")
+def _decode_token():
+    from app.core.security import create_access_token, decode_token
+
+    token = create_access_token(42)
+    return lambda: decode_token(token)
+
+
+@case("security.get_current_user_id")
+def _get_current_user_id():
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from app.core.security import create_access_token, get_current_user_id
+
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token(42))
+    return lambda: _run_coroutine(get_current_user_id(credentials))
+
+
+@case("security.get_password_hash")
+def _get_password_hash():
+    from app.core.security import get_password_hash
+
+    return lambda: get_password_hash("benchmark-password")
+
+
+@case("security.verify_password")
+def _verify_password():
+    from app.core.security import get_password_hash, verify_password
+
+    hashed = get_password_hash("benchmark-password")
+    return lambda: verify_password("benchmark-password", hashed)
+
+
+def _history_case(length: int):
+    def factory():
+        import redis
+
+        from app.core.redis import REDIS_MEMORY, get_sync_redis
+        from app.domain.LLM.memory import ConversationStore, build_conversation_history
+
+        user_email = f"microbench-{length}@example.com"
+        store = ConversationStore(get_sync_redis(REDIS_MEMORY))
+        try:
+            store.reset(user_email)
+        except redis.ConnectionError as e:
+            raise SkipCase(f"memory Redis unavailable ({e})")
+        for message in _history(length)[::2]:
+            store.append_turn(user_email, message["content"], KOREAN_TEXT)
+        return lambda: build_conversation_history(user_email)
+    return factory
+
+
+def _prompt_case(length: int):
+    def factory():
+        from app.domain.LLM.task import build_chat_prompt
+
+        history = _history(length)
+        return lambda: build_chat_prompt("깐깐한 팀장", "보고서 마감을 놓친 상황", history, KOREAN_TEXT)
+    return factory
+
+
+def _chat_messages(size: int) -> List[SimpleNamespace]:
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        SimpleNamespace(
+            id=i,
+            chat_room_id=1,
+            message_type=SimpleNamespace(value="user" if i % 2 == 0 else "assistant"),
+            content=KOREAN_TEXT,
+            created_at=created_at,
+        )
+        for i in range(size)
+    ]
+
+
+def _build_chat_history_response(messages):
+    """chatroom 라우터와 같은 방식으로 응답 모델 생성"""
+    from app.domain.chatroom.schemas import ChatHistoryResponse, ChatMessageItem
+
+    return ChatHistoryResponse(
+        chat_room_id=1,
+        messages=[
+            ChatMessageItem(
+                id=message.id,
+                chat_room_id=message.chat_room_id,
+                message_type=message.message_type.value,
+                content=message.content,
+                created_at=message.created_at,
+            )
+            for message in messages
+        ],
+    )
+
+
+def _response_build_case(size: int):
+    def factory():
+        messages = _chat_messages(size)
+        return lambda: _build_chat_history_response(messages)
+    return factory
+
+
+def _response_dump_case(size: int):
+    def factory():
+        response = _build_chat_history_response(_chat_messages(size))
+        return response.model_dump_json
+    return factory
+
+
+def _serialization_case(payload_name: str, serializer: str):
+    def factory():
+        from benchmarks.serialization_bench import RESULT_META, TASK_BODY, _kombu_case
+        from app.core.serialization import register_kombu_serializer
+
+        register_kombu_serializer()
+        payload = {"task_message": TASK_BODY, "task_result": RESULT_META}[payload_name]
+        encode, decode = _kombu_case(payload, serializer)
+        return lambda: decode(encode())
+    return factory
+
+
+for _length in HISTORY_LENGTHS:
+    case(f"memory.build_conversation_history[{_length}]")(_history_case(_length))
+for _length in HISTORY_LENGTHS:
+    case(f"task.build_chat_prompt[{_length}]")(_prompt_case(_length))
+for _size in RESPONSE_SIZES:
+    case(f"schemas.ChatHistoryResponse.build[{_size}]")(_response_build_case(_size))
+for _size in RESPONSE_SIZES:
+    case(f"schemas.ChatHistoryResponse.dump_json[{_size}]")(_response_dump_case(_size))
+for _payload in ("task_message", "task_result"):
+    for _serializer in ("json", "msgpackz"):
+        case(f"serialization.{_payload}.{_serializer}")(_serialization_case(_payload, _serializer))
+
+
+def measure(fn: Callable[[], object], repeat: int, min_time: float) -> Tuple[float, float, int]:
+    """(1회 중앙값 초, 1회 최소값 초, 반복당 실행 횟수)"""
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    runs = [timer.timeit(number) / number for _ in range(repeat)]
+    return statistics.median(runs), min(runs), number
+
+
+def run(names: List[str], repeat: int, min_time: float) -> Dict[str, dict]:
+    results = {}
+    for name in names:
+        try:
+            fn = _CASES[name]()
+        except SkipCase as e:
+            print(f"{name:<52} skipped: {e}")
+            continue
+        median, best, number = measure(fn, repeat, min_time)
+        results[name] = {"median_ns": round(median * 1e9, 1), "min_ns": round(best * 1e9, 1), "number": number}
+        print(f"{name:<52}{_format_ns(median * 1e9):>14}{_format_ns(best * 1e9):>14}")
+    return results
+
+
+def _format_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} us"
+    return f"{ns:.0f} ns"
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """기준값 대비 중앙값 변화 출력, 기준을 넘게 느려진 항목 반환"""
+    regressions = []
+    print()
+    print(f"{'benchmark':<52}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name, row in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<52}{'-':>14}{_format_ns(row['median_ns']):>14}{'new':>10}")
+            continue
+        change = (row["median_ns"] - base["median_ns"]) / base["median_ns"] * 100
+        mark = ""
+        if change > threshold:
+            mark = "  REGRESSION"
+            regressions.append(f"{name}: {change:+.1f}%")
+        elif change < -threshold:
+            mark = "  improved"
+        print(
+            f"{name:<52}{_format_ns(base['median_ns']):>14}{_format_ns(row['median_ns']):>14}"
+            f"{change:>+9.1f}%{mark}"
+        )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per repeat")
+    parser.add_argument("--save", help="write results as a baseline file")
+    parser.add_argument("--compare", help="compare against a baseline file")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change to report")
+    parser.add_argument("--fail-threshold", type=float, help="exit non-zero if a median slows down more than this percent")
+    args = parser.parse_args()
+
+    names = [name for name in _CASES if not args.filter or args.filter in name]
+    print(f"{'benchmark':<52}{'median':>14}{'min':>14}")
+    results = run(names, args.repeat, args.min_time)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "machine": f"{platform.system()} {platform.machine()}",
+                },
+                "results": results,
+            }, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        meta = baseline.get("meta", {})
+        print(f"\nbaseline: {meta.get('created_at')} (Python {meta.get('python')}, {meta.get('machine')})")
+        threshold = args.fail_threshold if args.fail_threshold is not None else args.threshold
+        regressions = compare(results, baseline["results"], threshold)
+        if args.fail_threshold is not None and regressions:
+            for regression in regressions:
+                print(f"FAIL {regression}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+직렬화 벤치마크: JSON vs msgpackz (msgpack + 임계값 압축)
+
+태스크 메시지, 태스크 결과, 대화 메모리 저장 형식별로
+인코딩된 바이트 수와 인코딩/디코딩 시간을 비교합니다.
+
+    PYTHONPATH=. python benchmarks/serialization_bench.py
+"""
+import json
+import timeit
+
+from kombu.serialization import dumps as kombu_dumps, loads as kombu_loads
+
+from app.core.serialization import SERIALIZER_NAME, dumps, loads, register_kombu_serializer
+
+KOREAN_REPLY = "네가 한 말은 방향은 맞았지만 상사의 입장을 먼저 생각하지 않았어. 다음에는 상황을 정리해서 말해 봐."
+
+# get_llm_message 메시지 본문 (Celery 프로토콜 2: args, kwargs, embed)
+TASK_BODY = (
+    [],
+    {
+        "character_id": 6,
+        "episode_id": 3,
+        "user_email": "user@example.com",
+        "user_id": 42,
+        "user_message": "죄송합니다. 보고서 마감을 하루만 미뤄주실 수 있을까요? 자료 확인이 늦어졌습니다.",
+        "reset_memory": False,
+        "turn": 7,
+    },
+    {"callbacks": None, "errbacks": None, "chain": None, "chord": None},
+)
+
+# finalize_session 결과 메타 (결과 백엔드에 저장되는 형태)
+RESULT_META = {
+    "status": "SUCCESS",
+    "result": {"result": KOREAN_REPLY * 4, "room_id": 12},
+    "traceback": None,
+    "children": [],
+    "date_done": "2026-10-17T09:00:00.000000+00:00",
+    "task_id": "5f0c8a9e-2d7b-4a1e-9c3f-0b6d7e8f9a10",
+}
+
+# 대화 메모리 40턴 (이전: LangChain 메시지 JSON, 현재: [role, content])
+HISTORY = [
+    ("user" if i % 2 == 0 else "assistant", KOREAN_REPLY[: 20 + i % 40])
+    for i in range(80)
+]
+
+
+def _langchain_json(role: str, content: str) -> bytes:
+    message_type = "human" if role == "user" else "ai"
+    return json.dumps({
+        "type": message_type,
+        "data": {
+            "content": content,
+            "additional_kwargs": {},
+            "response_metadata": {},
+            "type": message_type,
+            "name": None,
+            "id": None,
+            "example": False,
+        },
+    }).encode("utf-8")
+
+
+def _measure(encode, decode, number: int):
+    encoded = encode()
+    encode_us = timeit.timeit(encode, number=number) / number * 1e6
+    decode_us = timeit.timeit(lambda: decode(encoded), number=number) / number * 1e6
+    if isinstance(encoded, list):
+        size = sum(len(item) for item in encoded)
+    else:
+        size = len(encoded)
+    return size, encode_us, decode_us
+
+
+def _kombu_case(payload, serializer: str):
+    def encode():
+        return kombu_dumps(payload, serializer=serializer)[2]
+
+    content_type = "application/json" if serializer == "json" else f"application/x-{serializer}"
+    encoding = "utf-8" if serializer == "json" else "binary"
+
+    def decode(data):
+        return kombu_loads(data, content_type, encoding, accept=[content_type])
+
+    return encode, decode
+
+
+def run(number: int = 2000):
+    register_kombu_serializer()
+    rows = []
+
+    for name, payload in (("task message", TASK_BODY), ("task result", RESULT_META)):
+        for serializer in ("json", SERIALIZER_NAME):
+            encode, decode = _kombu_case(payload, serializer)
+            rows.append((name, serializer, *_measure(encode, decode, number)))
+
+    rows.append((
+        "chat history (80 msgs)",
+        "langchain json",
+        *_measure(
+            lambda: [_langchain_json(role, content) for role, content in HISTORY],
+            lambda items: [json.loads(item) for item in items],
+            number // 10,
+        ),
+    ))
+    rows.append((
+        "chat history (80 msgs)",
+        SERIALIZER_NAME,
+        *_measure(
+            lambda: [dumps([role, content]) for role, content in HISTORY],
+            lambda items: [loads(item) for item in items],
+            number // 10,
+        ),
+    ))
+    return rows
+
+
+def main():
+    rows = run()
+    print(f"{'payload':<24}{'format':<16}{'bytes':>8}{'encode us':>12}{'decode us':>12}")
+    for name, fmt, size, encode_us, decode_us in rows:
+        print(f"{name:<24}{fmt:<16}{size:>8}{encode_us:>12.1f}{decode_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()